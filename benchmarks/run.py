@@ -0,0 +1,300 @@
+"""
+Throughput benchmark of bankparse on synthetic statements, see synthetic.py.
+
+Each stage is run in its own process, so that its peak memory (VmHWM on Linux) is measured alone.
+The pages and rows of the files are counted in a process of their own too. The stages are:
+- handle_file: FileFactory.handle_file, i.e. bank detection and header of the file.
+- detect: detection of the bank alone, see bankparse.file_manager.detection.
+- first_page_words: layout of the words of the whole first page, the cost detection has to stay below.
+- constructor: the *AccountExtractionFile class of the bank, with every table extracted.
+- constructor_low_memory: same as constructor, with the pdf read in low memory mode (see PdfDocument).
+- get_dataframe: get_dataframe of every transaction table of a parsed file.
+- get_dataframe_typed: get_dataframe(typed=True) of every transaction table of a parsed file.
+
+The results are written as JSON, and can be compared with the results of another version.
+
+With --profiles, the tables of each file are built instead with the whole pages and pdfplumber's
+settings (stage profile_default), then with a candidate extraction profile of the bank (stage
+profile_bank, see bank_profiles), and the outputs of both are checked to be identical. The profiles
+are opt-in (see AccountExtractionFile.profile) until a candidate pays off.
+
+Usage:
+    python benchmarks/run.py [--pages N] [--rows N] [--repeat N] [--stages STAGE ...] [--output FILE] [--compare FILE]
+    python benchmarks/run.py --profiles [--pages N] [--rows N] [--repeat N] [--output FILE] [--compare FILE]
+"""
+from typing import Dict, List
+import argparse, json, math, os, platform, resource, subprocess, sys, tempfile, time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+def bank_profiles() -> Dict:
+    """
+    Returns:
+        The candidate extraction profile of each bank, by name of its extraction class.
+    """
+    from bankparse.pdf_document import ExtractionProfile, RULED_TABLE_SETTINGS
+
+    return {
+        # The tables are ruled and start below the bank's name, at the top of every page.
+        'CAAccountExtractionFile':ExtractionProfile((0, 30, math.inf, math.inf), RULED_TABLE_SETTINGS),
+        # The tables are ruled and end above the name of the branch, at the bottom of every page.
+        'CMAccountExtractionFile':ExtractionProfile((0, 0, math.inf, 800), RULED_TABLE_SETTINGS),
+        # The columns span the whole width (see BoursoWordStreamParser), only the footer is left out.
+        'BoursoAccountExtractionFile':ExtractionProfile((0, 0, math.inf, 790))
+    }
+
+STAGES = ('handle_file', 'detect', 'first_page_words', 'constructor', 'constructor_low_memory', 'get_dataframe', 'get_dataframe_typed')
+
+def _peak_rss_mb() -> float:
+    """
+    Peak RSS of the current process alone, in MB.
+    """
+    # ru_maxrss carries the peak of the parent over fork and exec on Linux: the high-water
+    # mark of the process's own memory, VmHWM, is read instead when available.
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+def run_stage(stage:str, file_path:str, repeat:int) -> Dict[str, float]:
+    """
+    Run a stage on a file, in the current process.
+
+    Returns:
+        - Dict[str, float]: best time in seconds over the repeats, peak RSS of the process
+        and peak RSS before the stage, in MB.
+    """
+    from bankparse.file_manager import FileFactory
+    from bankparse.file_manager.detection import detect_extraction_class
+    from bankparse.pdf_document import PdfDocument, DEFAULT_WORDS_SETTINGS
+
+    def on_document(function):
+        # A new parse session for each run, so that nothing is cached between the repeats.
+        def run():
+            with PdfDocument(file_path) as document:
+                return function(document)
+        return run
+
+    if stage == 'handle_file':
+        run = lambda: FileFactory.handle_file(file_path)
+    elif stage == 'detect':
+        run = on_document(detect_extraction_class)
+    elif stage == 'first_page_words':
+        run = on_document(lambda document: document.get_page_words(0, **DEFAULT_WORDS_SETTINGS))
+    elif stage in ('constructor', 'constructor_low_memory'):
+        # The bank is found from the first page only, so that the peak of the stage isn't the one of a lookup.
+        extraction_class = FileFactory.detect(file_path)
+        low_memory = stage == 'constructor_low_memory'
+        run = lambda: extraction_class(file_path, document=PdfDocument(file_path, low_memory=low_memory)).load()
+    elif stage in ('get_dataframe', 'get_dataframe_typed'):
+        tables = FileFactory.handle_file(file_path, load=True).transaction_tables
+        typed = stage == 'get_dataframe_typed'
+        run = lambda: [table.get_dataframe(typed=typed) for table in tables]
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    baseline_rss = _peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'seconds':min(timings),
+        'peak_rss_mb':_peak_rss_mb(),
+        'baseline_rss_mb':baseline_rss
+    }
+
+def _run_stage_in_subprocess(stage:str, file_path:str, repeat:int) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, __file__, '--stage', stage, '--file', file_path, '--repeat', str(repeat)],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(output.stdout)
+
+def _file_size(file_path:str) -> Dict[str, int]:
+    from bankparse.file_manager import FileFactory
+    from bankparse.pdf_document import PdfDocument
+
+    with PdfDocument(file_path, low_memory=True) as document:
+        pages = document.page_count
+    rows = sum(1 for _ in FileFactory.handle_file(file_path, low_memory=True).iter_transactions())
+    return {'pages':pages, 'rows':rows}
+
+def _file_size_in_subprocess(file_path:str) -> Dict[str, int]:
+    # Counted in its own process, so that the parent never parses a pdf file before the stages.
+    output = subprocess.run(
+        [sys.executable, __file__, '--size', '--file', file_path],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(output.stdout)
+
+def run_benchmark(pages:int, rows:int, repeat:int, stages:List[str] = STAGES) -> Dict:
+    """
+    Generate a synthetic statement per bank and run every stage on it.
+
+    Returns:
+        The results of the benchmark, see the module's docstring.
+    """
+    from synthetic import generate_corpus
+    from bankparse.cache import PARSER_VERSION
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = generate_corpus(directory, pages=pages, rows=rows)
+        for bank, (file_path,) in corpus.items():
+            size = _file_size_in_subprocess(file_path)
+            for stage in stages:
+                measure = _run_stage_in_subprocess(stage, file_path, repeat)
+                results.append({
+                    'bank':bank,
+                    'stage':stage,
+                    **size,
+                    **measure,
+                    'pages_per_sec':size['pages'] / measure['seconds'],
+                    'rows_per_sec':size['rows'] / measure['seconds']
+                })
+                print(
+                    f"{bank:<7} {stage:<20} {measure['seconds'] * 1000:10.1f} ms "
+                    f"{results[-1]['pages_per_sec']:10.1f} pages/s {results[-1]['rows_per_sec']:10.1f} rows/s "
+                    f"{measure['peak_rss_mb']:8.1f} MB",
+                    file=sys.stderr
+                )
+
+    return {
+        'parser_version':PARSER_VERSION,
+        'python':platform.python_version(),
+        'platform':platform.platform(),
+        'date':time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'params':{'pages':pages, 'rows':rows, 'repeat':repeat},
+        'results':results
+    }
+
+def _run_profile(extraction_class:type, file_path:str, profile, repeat:int) -> tuple[float, Dict]:
+    """
+    Build every table of a file with a profile.
+
+    Returns:
+        The best time in seconds over the repeats, and the tables of the file with its transactions.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extraction_file = extraction_class(file_path, profile=profile).load()
+        timings.append(time.perf_counter() - start)
+    # The serialized file records its profile: only what has been extracted is compared.
+    serialized = extraction_file.serialize()
+    output = {kind:serialized[kind] for kind in ('transaction_tables', 'statement_tables', 'credit_tables')}
+    output['transactions'] = list(extraction_file.iter_transactions())
+    return min(timings), output
+
+def run_profiles(pages:int, rows:int, repeat:int) -> Dict:
+    """
+    Generate a synthetic statement per bank, and build its tables with the default profile
+    and with the candidate extraction profile of the bank, see bank_profiles.
+
+    Returns:
+        The results of the benchmark, see the module's docstring. Each result of the bank's
+        profile tells whether its output is identical to the default one.
+    """
+    from synthetic import generate_corpus
+    from bankparse.cache import PARSER_VERSION
+    from bankparse.file_manager import FileFactory
+    from bankparse.pdf_document import ExtractionProfile
+
+    profiles = bank_profiles()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = generate_corpus(directory, pages=pages, rows=rows)
+        for bank, (file_path,) in corpus.items():
+            size = _file_size_in_subprocess(file_path)
+            extraction_class = FileFactory.detect(file_path)
+            outputs = {}
+            for stage, profile in (('profile_default', ExtractionProfile()), ('profile_bank', profiles[extraction_class.__name__])):
+                seconds, outputs[stage] = _run_profile(extraction_class, file_path, profile, repeat)
+                results.append({
+                    'bank':bank,
+                    'stage':stage,
+                    **size,
+                    'seconds':seconds,
+                    'pages_per_sec':size['pages'] / seconds,
+                    'rows_per_sec':size['rows'] / seconds
+                })
+            results[-1]['identical'] = outputs['profile_bank'] == outputs['profile_default']
+            print(
+                f"{bank:<7} {results[-2]['seconds'] * 1000:10.1f} ms default "
+                f"{results[-1]['seconds'] * 1000:10.1f} ms profile "
+                f"{results[-2]['seconds'] / results[-1]['seconds']:6.2f}x "
+                f"{'identical' if results[-1]['identical'] else 'DIFFERENT'}",
+                file=sys.stderr
+            )
+
+    return {
+        'parser_version':PARSER_VERSION,
+        'python':platform.python_version(),
+        'platform':platform.platform(),
+        'date':time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'params':{'pages':pages, 'rows':rows, 'repeat':repeat, 'profiles':True},
+        'results':results
+    }
+
+def compare(previous:Dict, current:Dict):
+    """
+    Print the throughput and memory of the current results relative to previous ones.
+    """
+    previous_results = {(result['bank'], result['stage']):result for result in previous['results']}
+    print(f"{'bank':<7} {'stage':<20} {'rows/s':>10} {'peak RSS':>10}")
+    for result in current['results']:
+        before = previous_results.get((result['bank'], result['stage']))
+        if before is None:
+            continue
+        print(
+            f"{result['bank']:<7} {result['stage']:<20} "
+            f"{result['rows_per_sec'] / before['rows_per_sec']:9.2f}x "
+            + (f"{result['peak_rss_mb'] / before['peak_rss_mb']:9.2f}x" if 'peak_rss_mb' in result else f"{'-':>10}")
+        )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark bankparse on synthetic statements.")
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=40, help="transactions per page")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--output', help="JSON file the results are written to")
+    parser.add_argument('--compare', help="JSON file of previous results to compare with")
+    parser.add_argument('--profiles', action='store_true', help="compare the extraction profiles of the banks with the defaults")
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    parser.add_argument('--file', help=argparse.SUPPRESS)
+    parser.add_argument('--size', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.size:
+        print(json.dumps(_file_size(args.file)))
+        sys.exit(0)
+
+    if args.stage is not None:
+        print(json.dumps(run_stage(args.stage, args.file, args.repeat)))
+        sys.exit(0)
+
+    if args.profiles:
+        output = run_profiles(args.pages, args.rows, args.repeat)
+    else:
+        output = run_benchmark(args.pages, args.rows, args.repeat, args.stages)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), output)
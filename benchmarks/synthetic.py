@@ -0,0 +1,266 @@
+"""
+Synthetic statement files, laid out like the statements of the supported banks.
+
+Real statements can't be shared: these files reproduce what the parsers rely on
+(header and footer markers, column positions, labels split over several lines,
+balance lines) with random transactions, so that the parsers can be benchmarked
+on corpora of any size.
+
+Usage:
+    python benchmarks/synthetic.py OUTPUT_DIR [--pages N] [--rows N] [--files N] [--seed N]
+"""
+import argparse, os, random
+
+def _encode(text:str) -> bytes:
+    out = bytearray()
+    for c in text:
+        if c == 'Ł':
+            # Bourso's 'Réf' is read as 'RŁf' by pdfplumber, see the /Differences of the font.
+            out += b'\x81'
+        else:
+            b = c.encode('cp1252')
+            if b in (b'(', b')', b'\\'):
+                out += b'\\'
+            out += b
+    return bytes(out)
+
+class Page():
+    """
+    Page of a pdf file, made of text and lines.
+
+    Args:
+        - width, height (int): size of the page in points.
+
+    Methods:
+    - text: write a text, at a distance from the top of the page.
+    - line: draw a line.
+    - grid: draw a ruled table, that pdfplumber's extract_tables detects.
+    """
+    def __init__(self, width:int, height:int):
+        self.width, self.height = width, height
+        self.ops = []
+
+    def text(self, x:float, top:float, text:str, size:int = 8):
+        y = self.height - top - size * 0.8
+        self.ops.append(b"BT /F1 %d Tf 1 0 0 1 %.2f %.2f Tm (" % (size, x, y) + _encode(text) + b") Tj ET")
+
+    def line(self, x0:float, top0:float, x1:float, top1:float):
+        self.ops.append(b"%.2f %.2f m %.2f %.2f l S" % (x0, self.height - top0, x1, self.height - top1))
+
+    def grid(self, xs:list[float], rows:list[list[str]], top:float, row_height:int = 12, size:int = 7) -> float:
+        """
+        Args:
+            - xs (list[float]): boundaries of the columns.
+            - rows (list[list[str]]): cells of the table.
+            - top (float): top of the table.
+
+        Returns:
+            The bottom of the table.
+        """
+        bottom = top + row_height * len(rows)
+        for i in range(len(rows) + 1):
+            self.line(xs[0], top + i * row_height, xs[-1], top + i * row_height)
+        for x in xs:
+            self.line(x, top, x, bottom)
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                if cell:
+                    self.text(xs[c] + 2, top + r * row_height + 2, cell, size=size)
+        return bottom
+
+def write_pdf(path:str, pages:list[Page]):
+    """
+    Write pages to a pdf file, using a single Helvetica font.
+    """
+    objects = []
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [129 /Lslash] >> >>")
+    pages_id = len(objects) + 1 + 2 * len(pages) + 1
+    kids = []
+    for page in pages:
+        stream = b"\n".join(page.ops)
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, page.width, page.height, font, content)
+        ))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    add(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % (i + 1) + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+def _amount(rng:random.Random, thousands:str) -> str:
+    value = rng.randint(100, 500000) / 100
+    return f"{value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', thousands)
+
+# Transactions fitting on a page of every layout.
+MAX_ROWS = 60
+
+def cm_statement(path:str, pages:int = 2, rows:int = 20, seed:int = 0):
+    """
+    Crédit Mutuel statement: one ruled transaction table per page, between an
+    opening and a closing balance, and the balance and credit tables on the last page.
+    """
+    rng = random.Random(seed)
+    out = []
+    n = 0
+    for p in range(pages):
+        page = Page(595, 842)
+        top = 40
+        if p == 0:
+            page.text(40, top, "M. JEAN DUPONT"); top += 12
+            page.text(40, top, "Le 31 janvier 2024"); top += 12
+        page.text(40, top, f"C/C EUROCOMPTE N° 000123456{p % 100:02d} EUR"); top += 16
+        table = [["Date", "Date valeur", "Opération", "Débit euros", "Crédit euros"]]
+        table.append(["SOLDE CREDITEUR AU 31/12/2023", "", "", "", "1.000,00"])
+        for r in range(rows):
+            n += 1
+            date = f"{rng.randint(1, 28):02d}/01/2024"
+            debit = rng.random() < 0.7
+            table.append([date, date, f"PAIEMENT CB {n}", _amount(rng, '.') if debit else "", "" if debit else _amount(rng, '.')])
+            if r % 4 == 0:
+                table.append(["", "", f"SUITE LIBELLE {n}", "", ""])
+        table.append(["SOLDE CREDITEUR AU 31/01/2024", "", "", "", "2.000,00"])
+        top = page.grid([30, 170, 220, 400, 470, 540], table, top, row_height=min(12, 700 // len(table))) + 20
+        if p == pages - 1:
+            top = page.grid([30, 200, 400, 540], [["Compte", "Libellé", "Solde"], ["00012345600", "EUROCOMPTE", "2.000,00"]], min(top, 740), row_height=8) + 4
+            page.grid([30, 150, 300, 420, 540], [["Prêt", "Capital", "Taux", "Echéance"], ["PRET AUTO", "10.000,00", "3,5", "250,00"]], min(top, 762), row_height=8)
+        page.text(40, 805, "CAISSE DE CREDIT MUTUEL DE TEST")
+        out.append(page)
+    write_pdf(path, out)
+
+def ca_statement(path:str, pages:int = 2, rows:int = 20, seed:int = 0):
+    """
+    Crédit Agricole statement: dd.mm dates, one ruled transaction table per page,
+    between the 'Ancien solde' and 'Nouveau solde' lines.
+    """
+    rng = random.Random(seed)
+    out = []
+    n = 0
+    header = ["Date opé.", "Date valeur", "Libellé des opérations", "Débit", "Crédit", "¨"]
+    xs = [30, 75, 120, 380, 450, 520, 560]
+    for p in range(pages):
+        page = Page(595, 842)
+        page.text(40, 10, "CREDIT AGRICOLE")
+        top = 40
+        if p == 0:
+            page.text(40, top, "M. JEAN DUPONT"); top += 12
+            page.text(40, top, "Relevé du 15 mars 2024"); top += 12
+            page.text(40, top, "Compte de Dépôt n° 12345678901"); top += 16
+        table = [header]
+        if p == 0:
+            table.append(["", "", "Ancien solde créditeur au 29.02.2024", "", "1 000,00", ""])
+        for r in range(rows):
+            n += 1
+            date = f"{rng.randint(1, 28):02d}.03"
+            debit = rng.random() < 0.7
+            table.append([date, date, f"PRLV SEPA {n}", _amount(rng, ' ') if debit else "", "" if debit else _amount(rng, ' '), ""])
+            if r % 5 == 0:
+                table.append(["", "", f"REF {n}", "", "", ""])
+        if p == pages - 1:
+            table.append(["", "", "Total des opérations", "1 234,00", "567,00", ""])
+            table.append(["", "", "Nouveau solde créditeur au 15.03.2024", "", "2 000,00", ""])
+        page.grid(xs, table, top, row_height=min(12, 760 // len(table)))
+        out.append(page)
+    write_pdf(path, out)
+
+def bourso_statement(path:str, pages:int = 2, rows:int = 20, seed:int = 0):
+    """
+    Bourso Bank statement: no ruled table, the columns are told apart by the position
+    of the words. Labels span several lines, followed by 'Réf :' lines, between the
+    'SOLDE AU' and 'Nouveau solde' lines.
+    """
+    rng = random.Random(seed)
+    out = []
+    n = 0
+    for p in range(pages):
+        page = Page(842, 842)
+        top = 40
+        if p == 0:
+            page.text(40, top, "M. DUPONT JEAN"); top += 12
+            page.text(40, top, "Relevé au 31/01/2024"); top += 12
+            page.text(40, top, "FR76 1234 5678 9012 3456 7890 123"); top += 16
+            page.text(100, top, "SOLDE AU"); page.text(200, top, "AU"); page.text(230, top, ":")
+            page.text(380, top, "31/12/2023"); page.text(560, top, "1.000,00"); top += 16
+        page.text(400, top, "MOUVEMENTS"); page.text(480, top, "EN EUR"); top += 14
+        lines = rows + (rows + 2) // 3 + 2 * ((rows + 3) // 4)
+        line_height = min(12, (760 - top) / lines)
+        for r in range(rows):
+            n += 1
+            date = f"{rng.randint(1, 28):02d}/01/2024"
+            debit = rng.random() < 0.7
+            page.text(40, top, date)
+            page.text(100, top, f"CARTE {n}")
+            page.text(380, top, date)
+            page.text(440 if debit else 560, top, _amount(rng, '.'))
+            top += line_height
+            if r % 3 == 0:
+                page.text(100, top, f"SUITE {n}"); top += line_height
+            if r % 4 == 0:
+                page.text(100, top, "RŁf"); page.text(118, top, ":"); page.text(126, top, f"REF{n}"); top += line_height
+                page.text(100, top, "IGNORED"); top += line_height
+        if p == pages - 1:
+            page.text(100, top, "Nouveau"); page.text(140, top, "solde"); page.text(170, top, "en")
+            page.text(190, top, "EUR"); page.text(215, top, ":"); page.text(560, top, "2.000,00")
+        page.text(40, 800, "Boursorama")
+        out.append(page)
+    write_pdf(path, out)
+
+GENERATORS = {
+    'ca':ca_statement,
+    'cm':cm_statement,
+    'bourso':bourso_statement
+}
+
+def generate_corpus(directory:str, pages:int = 2, rows:int = 20, files:int = 1, seed:int = 0) -> dict[str, list[str]]:
+    """
+    Write synthetic statements of every bank to a directory.
+
+    Args:
+        - directory (str): output directory.
+        - pages (int): number of pages of each statement.
+        - rows (int): number of transactions per page, at most MAX_ROWS.
+        - files (int): number of statements per bank.
+        - seed (int): seed of the random transactions.
+
+    Returns:
+        - dict[str, list[str]]: paths of the statements, per bank ('ca', 'cm', 'bourso').
+    """
+    if rows > MAX_ROWS:
+        raise ValueError(f"At most {MAX_ROWS} transactions fit on a page.")
+
+    os.makedirs(directory, exist_ok=True)
+    output = {}
+    for bank, generator in GENERATORS.items():
+        output[bank] = []
+        for i in range(files):
+            path = os.path.join(directory, f"{bank}_{pages}p_{rows}r_{i}.pdf")
+            generator(path, pages=pages, rows=rows, seed=seed + i)
+            output[bank].append(path)
+    return output
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write synthetic statement files.")
+    parser.add_argument('directory')
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=20, help="transactions per page")
+    parser.add_argument('--files', type=int, default=1, help="statements per bank")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for paths in generate_corpus(args.directory, args.pages, args.rows, args.files, args.seed).values():
+        print('\n'.join(paths))
@@ -0,0 +1,134 @@
+from typing import Iterable, Iterator
+import os, uuid
+
+# Columns of the Arrow tables of transactions, shared by every bank.
+TRANSACTION_COLUMNS = (
+    ('source_bank', 'string'),
+    ('owner', 'string'),
+    ('extraction_date', 'date32'),
+    ('accountId', 'string'),
+    ('operation_date', 'date32'),
+    ('value_date', 'date32'),
+    ('label', 'string'),
+    ('debit', 'float64'),
+    ('credit', 'float64')
+)
+
+# Columns of the parquet datasets of transactions the data is partitioned on.
+PARTITION_COLUMNS = ('source_bank', 'accountId', 'month')
+
+def import_pyarrow():
+    """
+    Import pyarrow, which is an optional dependency of bankparse.
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for the Arrow and Parquet outputs, install bankparse[arrow]."
+        ) from e
+    return pyarrow
+
+def transaction_schema():
+    """
+    Returns:
+        The pyarrow schema of the transaction tables, see BankTransactionTable.to_arrow.
+    """
+    pa = import_pyarrow()
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in TRANSACTION_COLUMNS])
+
+def dataset_schema():
+    """
+    Returns:
+        The pyarrow schema of the parquet datasets of transactions: the transaction schema
+        and the month of the statement (yyyy-mm), see write_transactions_dataset.
+    """
+    pa = import_pyarrow()
+    return transaction_schema().append(pa.field('month', pa.string()))
+
+def date_array(dates:list[str]):
+    """
+    Convert dates under yyyy-mm-dd format to a date32 array. Invalid dates become null.
+    """
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    timestamps = pc.strptime(pa.array(dates, pa.string()), format='%Y-%m-%d', unit='s', error_is_null=True)
+    return timestamps.cast(pa.date32())
+
+def amount_array(amounts:list[str]):
+    """
+    Convert amounts using '.' as decimal separator to a float64 array. Empty amounts become null.
+    """
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    amounts = pa.array(amounts, pa.string())
+    amounts = pc.if_else(pc.equal(amounts, ''), pa.scalar(None, pa.string()), amounts)
+    return amounts.cast(pa.float64())
+
+def _iter_batches(extraction_files:Iterable) -> Iterator:
+    pa = import_pyarrow()
+    schema = dataset_schema()
+
+    for extraction_file in extraction_files:
+        if extraction_file is None:
+            continue
+        # Files whose extraction date wasn't found go to the null partition.
+        month = (extraction_file.extraction_date or '')[:7] or None
+        for table in extraction_file.transaction_tables or []:
+            arrow_table = table.to_arrow()
+            if arrow_table.num_rows == 0:
+                continue
+            arrow_table = arrow_table.append_column('month', pa.array([month] * arrow_table.num_rows, pa.string()))
+            yield from arrow_table.cast(schema).to_batches()
+
+def write_transactions_dataset(extraction_files:Iterable, base_dir:str, max_rows_per_file:int = 1_000_000) -> int:
+    """
+    Append the transactions of many extraction files to a parquet dataset partitioned by
+    bank, account and month of the statement (hive layout:
+    base_dir/source_bank=.../accountId=.../month=yyyy-mm/).
+
+    The files are processed one by one and their transactions written as they come, so that
+    the whole dataset is never held in memory. Every call writes new files, the data already
+    in base_dir is left untouched.
+
+    Args:
+        - extraction_files (Iterable[AccountExtractionFile]): parsed files, e.g. the outputs of
+        FileFactory.handle_file. None values are skipped.
+        - base_dir (str): root directory of the dataset.
+        - max_rows_per_file (int): maximum number of rows of a parquet file.
+
+    Returns:
+        The number of transactions written.
+
+    Comments:
+    - The dataset can be read with pyarrow.dataset.dataset(base_dir, partitioning='hive'),
+    filters on the partition columns don't read the other partitions.
+    """
+    pa = import_pyarrow()
+    import pyarrow.dataset as ds
+
+    schema = dataset_schema()
+    written = 0
+
+    def counted_batches():
+        nonlocal written
+        for batch in _iter_batches(extraction_files):
+            written += batch.num_rows
+            yield batch
+
+    os.makedirs(base_dir, exist_ok=True)
+    ds.write_dataset(
+        counted_batches(),
+        base_dir,
+        schema=schema,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor='hive'),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_file=max_rows_per_file,
+        max_rows_per_group=min(max_rows_per_file, 128 * 1024)
+    )
+
+    return written
@@ -0,0 +1,181 @@
+from bankparse.file_manager import FileFactory
+from bankparse.cache import ParseCache
+from bankparse.instrumentation import ParseStats, collect
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from collections import deque
+from typing import AsyncIterator, Iterable, Iterator, List, Dict, Any
+import asyncio, itertools, os
+
+def parse_file(file_path:str, cache:ParseCache = None, collect_stats:bool = False, low_memory:bool = False) -> Dict[str, Any]:
+    """
+    Parse a single statement file and return a lightweight result record.
+    Errors are caught and reported in the record instead of being raised, so that
+    a corrupt or unrecognized file doesn't abort a batch.
+
+    Args:
+        - file_path (str): path of the pdf file.
+        - cache (ParseCache): optional cache of parse results, see FileFactory.handle_file.
+        - collect_stats (bool): add the stats of the parsing to the record, see bankparse.instrumentation.
+        - low_memory (bool): release the layout objects of each page right after use, see PdfDocument.
+
+    Returns:
+        - Dict[str, Any] with the keys:
+            - file_path (str): path of the pdf file.
+            - status (str): 'ok' or 'error'.
+            - error (str | None): description of the error.
+            - result (dict | None): output of AccountExtractionFile.serialize.
+            Can be turned back into an extraction file with AccountExtractionFile.deserialize.
+            - stats (dict): only if collect_stats, output of ParseStats.to_dict.
+    """
+    if collect_stats:
+        with collect() as stats:
+            record = parse_file(file_path, cache=cache, low_memory=low_memory)
+        record['stats'] = stats.to_dict()
+        return record
+
+    try:
+        extraction_file = FileFactory.handle_file(file_path, cache=cache, low_memory=low_memory, load=True)
+        if extraction_file is None:
+            return {
+                'file_path':file_path,
+                'status':'error',
+                'error':"File hasn't been recognized.",
+                'result':None
+            }
+        result = extraction_file.serialize()
+    except Exception as e:
+        return {
+            'file_path':file_path,
+            'status':'error',
+            'error':f"{type(e).__name__}: {e}",
+            'result':None
+        }
+
+    return {
+        'file_path':file_path,
+        'status':'ok',
+        'error':None,
+        'result':result
+    }
+
+def _parse_chunk(paths:List[str], **kwargs) -> List[Dict[str, Any]]:
+    return [parse_file(path, **kwargs) for path in paths]
+
+def iter_parse_many(paths:Iterable[str], jobs:int = None, chunksize:int = None, cache:ParseCache = None, stats:ParseStats = None, low_memory:bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Parse many statement files over a pool of processes.
+    Results are yielded in the order of paths as soon as they are available.
+
+    Args:
+        - paths (Iterable[str]): paths of the pdf files.
+        - jobs (int): number of worker processes. Defaults to the number of cpus.
+        With jobs=1, the files are parsed in the current process.
+        - chunksize (int): number of files sent to a worker at once. Defaults to a
+        value keeping every worker busy while limiting inter-process overhead.
+        At most jobs * 2 chunks are submitted at once, the next one being submitted when
+        the oldest one is yielded, so that the results waiting to be read stay bounded.
+        - cache (ParseCache): optional cache of parse results, shared by the workers.
+        - stats (ParseStats): if given, the stats of the parsing of every file, including
+        the ones parsed by the workers, are added to it.
+        - low_memory (bool): release the layout objects of each page right after use, see PdfDocument.
+
+    Returns:
+        An iterator over the records returned by parse_file.
+    """
+    paths = list(paths)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(paths)))
+
+    parse = partial(parse_file, cache=cache, collect_stats=stats is not None, low_memory=low_memory)
+    if jobs == 1:
+        records = map(parse, paths)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(paths) // (jobs * 4))
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        records = _iter_windowed(executor, paths, chunksize, jobs * 2, cache=cache, collect_stats=stats is not None, low_memory=low_memory)
+
+    try:
+        for record in records:
+            if stats is not None:
+                stats.merge(record.pop('stats'))
+            yield record
+    finally:
+        if jobs != 1:
+            executor.shutdown(cancel_futures=True)
+
+def _iter_windowed(executor:Executor, paths:List[str], chunksize:int, window:int, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Submit the chunks of paths to the executor, at most window of them at once, and
+    yield their records in order.
+    """
+    chunks = (paths[i:i + chunksize] for i in range(0, len(paths), chunksize))
+    futures = deque(executor.submit(_parse_chunk, chunk, **kwargs) for chunk in itertools.islice(chunks, window))
+    while futures:
+        records = futures.popleft().result()
+        chunk = next(chunks, None)
+        if chunk is not None:
+            futures.append(executor.submit(_parse_chunk, chunk, **kwargs))
+        yield from records
+
+def parse_many(paths:Iterable[str], jobs:int = None, chunksize:int = None, cache:ParseCache = None, stats:ParseStats = None, low_memory:bool = False) -> List[Dict[str, Any]]:
+    """
+    Parse many statement files over a pool of processes.
+
+    Args:
+        - paths (Iterable[str]): paths of the pdf files.
+        - jobs (int): number of worker processes. Defaults to the number of cpus.
+        - chunksize (int): number of files sent to a worker at once.
+        - cache (ParseCache): optional cache of parse results, shared by the workers.
+        - stats (ParseStats): if given, the stats of the parsing are added to it.
+        - low_memory (bool): release the layout objects of each page right after use, see PdfDocument.
+
+    Returns:
+        - List[Dict[str, Any]]: one record per file, in the order of paths. See parse_file.
+    """
+    return list(iter_parse_many(paths, jobs=jobs, chunksize=chunksize, cache=cache, stats=stats, low_memory=low_memory))
+
+async def aiter_parse_many(paths:Iterable[str], executor:Executor = None, limit:int = None, cache:ParseCache = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse many statement files from an asyncio application, without blocking the event loop.
+    Records are yielded as soon as each file is parsed, not in the order of paths.
+
+    At most limit files are submitted to the executor at once, the next one being submitted
+    when one completes, so that memory stays bounded whatever the number of paths.
+
+    Args:
+        - paths (Iterable[str]): paths of the pdf files. Consumed lazily.
+        - executor (Executor): executor running parse_file, e.g. a ProcessPoolExecutor.
+        Defaults to the default executor of the event loop, a pool of threads.
+        - limit (int): maximum number of files being parsed at once. Defaults to the number of cpus.
+        - cache (ParseCache): optional cache of parse results.
+
+    Returns:
+        An async iterator over the records returned by parse_file, in order of completion.
+
+    Example:
+        async for record in aiter_parse_many(paths, executor=ProcessPoolExecutor()):
+            ...
+    """
+    if limit is None:
+        limit = os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    paths = iter(paths)
+
+    def submit(path:str) -> asyncio.Future:
+        return loop.run_in_executor(executor, partial(parse_file, path, cache=cache))
+
+    pending = {submit(path) for path in itertools.islice(paths, max(1, limit))}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                path = next(paths, None)
+                if path is not None:
+                    pending.add(submit(path))
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
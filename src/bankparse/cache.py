@@ -0,0 +1,170 @@
+from importlib.metadata import version, PackageNotFoundError
+from typing import Any, Dict
+import hashlib, json, os, tempfile
+
+CACHE_FORMAT = 2
+
+def _package_version() -> str:
+    try:
+        return version('bankparse')
+    except PackageNotFoundError:
+        return 'unknown'
+
+PARSER_VERSION = f"{_package_version()}-{CACHE_FORMAT}"
+
+def content_hash(file_path:str) -> str:
+    """
+    Returns:
+        The sha256 of the content of a file.
+    """
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+class ParseCache():
+    """
+    Persistent cache of parse results, stored on disk as JSON files.
+
+    Entries are keyed by the sha256 of the pdf file's content, the parser version and the
+    extraction profile, so that a file re-issued under another name is a hit and a new
+    version of bankparse never reads results produced by an older one.
+
+    The cache can be shared by several processes: entries are written to a temporary
+    file and atomically moved into place, and a missing entry (e.g. evicted by another
+    process) is treated as a miss.
+
+    Attributes:
+    - directory (str): directory holding the cache entries.
+    - max_size (int): maximum size of the cache in bytes. When exceeded, the least
+    recently used entries are removed.
+
+    Methods:
+    - key: compute the cache key of a pdf file.
+    - get: read an entry.
+    - put: write an entry.
+    - evict: remove the least recently used entries when the cache exceeds max_size.
+    - clear: remove every entry.
+    """
+    def __init__(self, directory:str, max_size:int = 1024**3):
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, file_path:str, digest:str = None, profile:tuple = None) -> str:
+        """
+        Args:
+            - file_path (str): path of the pdf file.
+            - digest (str): sha256 of the content of the file if it is known already,
+            see content_hash, so that the file isn't read again.
+            - profile (ExtractionProfile): extraction profile the file is parsed with, if any.
+
+        Returns:
+            The cache key of the file: hash of its content, of the parser version and of
+            the profile, so that the results of each profile are kept side by side.
+        """
+        if digest is None:
+            digest = content_hash(file_path)
+        key = f"{PARSER_VERSION}:{digest}"
+        # The default profile, whole pages and pdfplumber's settings, keeps the plain key.
+        if profile is not None and any(field is not None for field in profile):
+            key += ':' + json.dumps(list(profile), sort_keys=True, default=repr)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _entry_path(self, key:str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key:str) -> Dict[str, Any] | None:
+        """
+        Args:
+            - key (str): cache key, see key.
+
+        Returns:
+            The cached data, None if there isn't any.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        return data
+
+    def put(self, key:str, data:Dict[str, Any]):
+        """
+        Args:
+            - key (str): cache key, see key.
+            - data (dict): data to cache, made of builtin types.
+        """
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced_size = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced_size = 0
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        # The size of the cache is only scanned again once this process's own writes
+        # may have filled it up, so that a put doesn't cost a walk over every entry.
+        if self._size is None:
+            self._size = sum(entry[1] for entry in self._entries())
+        else:
+            self._size += os.path.getsize(path) - replaced_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_size.
+        Some room is freed below max_size, so that the next writes don't trigger
+        an eviction each.
+        """
+        entries = list(self._entries())
+        size = sum(entry[1] for entry in entries)
+        self._size = size
+        if size <= self.max_size:
+            return
+
+        target = int(self.max_size * 0.9)
+        entries.sort(key=lambda entry: entry[2])
+        for path, entry_size, _ in entries:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            if size <= target:
+                break
+        self._size = size
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        for path, _, _ in list(self._entries()):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
@@ -0,0 +1,302 @@
+from bankparse.file_manager import FileFactory, AccountExtractionFile
+from bankparse.cache import ParseCache, content_hash
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterator, List
+import os, sqlite3, time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    extraction_class TEXT,
+    source_bank TEXT,
+    owner TEXT,
+    extraction_date TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    accountId TEXT NOT NULL,
+    accountLabel TEXT,
+    PRIMARY KEY (path, accountId)
+);
+CREATE INDEX IF NOT EXISTS files_source_bank ON files(source_bank, extraction_date);
+CREATE INDEX IF NOT EXISTS files_extraction_date ON files(extraction_date);
+CREATE INDEX IF NOT EXISTS files_content_hash ON files(content_hash);
+CREATE INDEX IF NOT EXISTS accounts_accountId ON accounts(accountId);
+"""
+
+def scan_file(file_path:str, cache:ParseCache = None) -> Dict[str, Any]:
+    """
+    Read the header of a statement file: its bank, owner, extraction date and accounts.
+    The tables of the file aren't extracted. Errors are reported in the record instead
+    of being raised.
+
+    Args:
+        - file_path (str): path of the pdf file.
+        - cache (ParseCache): optional cache of parse results, see FileFactory.handle_file.
+        On a hit the header is read from the cache. On a miss only the header is scanned,
+        and nothing is written to the cache: an entry holds the tables of the file.
+
+    Returns:
+        - Dict[str, Any] with the keys: path, size, mtime_ns, content_hash, status ('ok' or 'error'),
+        error, extraction_class, source_bank, owner, extraction_date and accounts.
+    """
+    stat = os.stat(file_path)
+    digest = content_hash(file_path)
+    record = {
+        'path':file_path,
+        'size':stat.st_size,
+        'mtime_ns':stat.st_mtime_ns,
+        'content_hash':digest,
+        'status':'ok',
+        'error':None,
+        'extraction_class':None,
+        'source_bank':None,
+        'owner':None,
+        'extraction_date':None,
+        'accounts':[]
+    }
+
+    try:
+        data = cache.get(cache.key(file_path, digest=digest)) if cache is not None else None
+        if data is not None:
+            extraction_file = AccountExtractionFile.deserialize(dict(data, file_path=file_path))
+        else:
+            extraction_file = FileFactory.handle_file(file_path)
+        if extraction_file is None:
+            record.update(status='error', error="File hasn't been recognized.")
+            return record
+
+        record.update(
+            extraction_class=type(extraction_file).__name__,
+            source_bank=extraction_file.sourceBankLabel,
+            owner=extraction_file.owner,
+            extraction_date=extraction_file.extraction_date,
+            accounts=extraction_file.accountIds_NamesMatching(pdf_lines=extraction_file.content)
+        )
+    except Exception as e:
+        record.update(status='error', error=f"{type(e).__name__}: {e}")
+
+    return record
+
+class StatementCatalog():
+    """
+    Persistent catalog of statement files, stored in a SQLite database.
+
+    Each file is recorded with its size, modification time and content hash, and the
+    header of the statement: bank, owner, extraction date and accounts. sync only
+    parses the files that are new or have changed since the last sync, and find
+    selects files by bank, account or date without opening any pdf file.
+
+    Attributes:
+    - database_path (str): path of the SQLite database.
+    - cache (ParseCache): optional cache of parse results, used when parsing files.
+
+    Methods:
+    - sync: bring the catalog up to date with a directory.
+    - find: select the files matching some criteria.
+    - get: return the record of a file.
+    - close: close the database.
+
+    Comments:
+    - A file whose size and modification time haven't changed isn't read at all.
+    A file that has been touched but whose content hasn't changed is hashed but not parsed.
+    - Files that can't be parsed are recorded with an error status, and only parsed again
+    once they change.
+    """
+    def __init__(self, database_path:str, cache:ParseCache = None):
+        self.database_path = database_path
+        self.cache = cache
+        self.connection = sqlite3.connect(database_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _iter_pdf_files(directory:str) -> Iterator[os.DirEntry]:
+        stack = [directory]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith('.pdf'):
+                        yield entry
+
+    def _write(self, record:Dict[str, Any]):
+        self.connection.execute('DELETE FROM accounts WHERE path = ?', (record['path'],))
+        self.connection.execute(
+            """
+            INSERT OR REPLACE INTO files (
+                path, size, mtime_ns, content_hash, status, error,
+                extraction_class, source_bank, owner, extraction_date, synced_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                record['path'], record['size'], record['mtime_ns'], record['content_hash'],
+                record['status'], record['error'], record['extraction_class'], record['source_bank'],
+                record['owner'], record['extraction_date'], time.time()
+            )
+        )
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO accounts (path, accountId, accountLabel) VALUES (?, ?, ?)',
+            [(record['path'], str(account['accountId']), account.get('accountLabel')) for account in record['accounts']]
+        )
+
+    def sync(self, directory:str, jobs:int = 1, remove_missing:bool = True) -> Dict[str, int]:
+        """
+        Bring the catalog up to date with the pdf files of a directory and its subdirectories.
+
+        Args:
+            - directory (str): directory holding the statement files.
+            - jobs (int): number of worker processes parsing the new files.
+            - remove_missing (bool): remove from the catalog the files of the directory
+            that don't exist anymore.
+
+        Returns:
+            - Dict[str, int]: number of files 'added', 'updated', 'unchanged', 'removed'
+            and of 'errors' among the parsed files.
+        """
+        directory = os.path.abspath(directory)
+        known = {
+            row['path']:row
+            for row in self.connection.execute('SELECT path, size, mtime_ns, content_hash FROM files')
+        }
+        summary = {'added':0, 'updated':0, 'unchanged':0, 'removed':0, 'errors':0}
+
+        seen = set()
+        to_parse = []
+        for entry in self._iter_pdf_files(directory):
+            seen.add(entry.path)
+            row = known.get(entry.path)
+            if row is None:
+                to_parse.append(entry.path)
+                continue
+
+            stat = entry.stat()
+            if (row['size'], row['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                summary['unchanged'] += 1
+            elif content_hash(entry.path) == row['content_hash']:
+                self.connection.execute(
+                    'UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?',
+                    (stat.st_size, stat.st_mtime_ns, entry.path)
+                )
+                summary['unchanged'] += 1
+            else:
+                to_parse.append(entry.path)
+        self.connection.commit()
+
+        for i, record in enumerate(self._scan_many(to_parse, jobs)):
+            summary['updated' if record['path'] in known else 'added'] += 1
+            summary['errors'] += record['status'] == 'error'
+            self._write(record)
+            if i % 500 == 499:
+                self.connection.commit()
+        self.connection.commit()
+
+        if remove_missing:
+            prefix = os.path.join(directory, '')
+            missing = [(path,) for path in known if path.startswith(prefix) and path not in seen]
+            self.connection.executemany('DELETE FROM files WHERE path = ?', missing)
+            self.connection.commit()
+            summary['removed'] = len(missing)
+
+        return summary
+
+    def _scan_many(self, paths:List[str], jobs:int) -> Iterator[Dict[str, Any]]:
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths)))
+        if jobs == 1:
+            for path in paths:
+                yield scan_file(path, cache=self.cache)
+            return
+
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(partial(scan_file, cache=self.cache), paths, chunksize=chunksize)
+
+    def _record(self, row:sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record['accounts'] = [
+            dict(account)
+            for account in self.connection.execute(
+                'SELECT accountId, accountLabel FROM accounts WHERE path = ? ORDER BY accountId', (row['path'],)
+            )
+        ]
+        return record
+
+    def get(self, file_path:str) -> Dict[str, Any] | None:
+        """
+        Args:
+            - file_path (str): path of the pdf file.
+
+        Returns:
+            The record of the file, see scan_file. None if the file isn't in the catalog.
+        """
+        row = self.connection.execute(
+            'SELECT * FROM files WHERE path = ?', (os.path.abspath(file_path),)
+        ).fetchone()
+        return self._record(row) if row is not None else None
+
+    def find(
+            self,
+            source_bank:str = None,
+            accountId:str = None,
+            owner:str = None,
+            start_date:str = None,
+            end_date:str = None,
+            include_errors:bool = False
+        ) -> List[Dict[str, Any]]:
+        """
+        Select the files of the catalog matching every given criteria, without opening them.
+
+        Args:
+            - source_bank (str): label of the bank, e.g. 'Crédit Mutuel'.
+            - accountId (str): id of an account within the file.
+            - owner (str)
+            - start_date, end_date (str): bounds, included, of the extraction date under yyyy-mm-dd format.
+            - include_errors (bool): also return the files that couldn't be parsed.
+
+        Returns:
+            - List[Dict[str, Any]]: records of the files by extraction date, see scan_file.
+        """
+        clauses, parameters = [], []
+        if source_bank is not None:
+            clauses.append('source_bank = ?')
+            parameters.append(source_bank)
+        if accountId is not None:
+            clauses.append('path IN (SELECT path FROM accounts WHERE accountId = ?)')
+            parameters.append(str(accountId))
+        if owner is not None:
+            clauses.append('owner = ?')
+            parameters.append(owner)
+        if start_date is not None:
+            clauses.append('extraction_date >= ?')
+            parameters.append(start_date)
+        if end_date is not None:
+            clauses.append('extraction_date <= ?')
+            parameters.append(end_date)
+        if not include_errors:
+            clauses.append("status = 'ok'")
+
+        query = 'SELECT * FROM files'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY extraction_date, path'
+
+        return [self._record(row) for row in self.connection.execute(query, parameters)]
@@ -0,0 +1,228 @@
+"""
+Command-line entry point of bankparse, installed as the `bankparse` console script.
+
+Usage:
+    bankparse [--kind KIND] [--format FORMAT] [--output FILE] [--jobs N] [--cache DIR] [--low-memory] [--stats] PATH [PATH ...]
+
+PATH can be a pdf file, a directory (searched recursively for pdf files) or a glob pattern.
+The rows are written to stdout unless --output is given, so that they can be piped.
+"""
+from bankparse.batch import iter_parse_many
+from bankparse.cache import ParseCache
+from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.instrumentation import ParseStats
+from bankparse.ndjson import write_records
+from typing import Dict, Iterable, Iterator, List, Any
+from unidecode import unidecode
+import argparse, csv, glob, os, re, sys, time
+
+KINDS = ('transactions', 'balances', 'statements', 'credits')
+FORMATS = ('ndjson', 'csv', 'parquet')
+
+# Columns of the balance statements, whatever the bank.
+BALANCE_COLUMNS = ('source_bank', 'owner', 'extraction_date', 'accountId', 'statement_date', 'balance')
+
+def expand_paths(inputs:Iterable[str]) -> List[str]:
+    """
+    Turn files, directories and glob patterns into a list of pdf files, without duplicates.
+    Directories are searched recursively.
+    """
+    output = []
+    seen = set()
+
+    def add(path:str):
+        if path not in seen:
+            seen.add(path)
+            output.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in sorted(os.walk(item)):
+                for name in sorted(files):
+                    if name.lower().endswith('.pdf'):
+                        add(os.path.join(root, name))
+        elif os.path.isfile(item):
+            add(item)
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path) and path.lower().endswith('.pdf'):
+                    add(path)
+    return output
+
+def _table_rows(tables:List | None) -> Iterator[Dict[str, Any]]:
+    for table in tables or []:
+        yield from table.iter_records()
+
+def iter_rows(extraction_file:AccountExtractionFile, kind:str) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of a parsed file for one kind of output.
+
+    Args:
+        - extraction_file (AccountExtractionFile): parsed file.
+        - kind (str): 'transactions' (normalized transactions), 'balances' (balance statements
+        of the transaction tables), 'statements' or 'credits' (rows of the statement and credit tables).
+    """
+    if kind == 'transactions':
+        # From the tables rather than extraction_file.iter_transactions, which reads the pdf file again.
+        for table in extraction_file.transaction_tables or []:
+            yield from table.iter_transactions()
+    elif kind == 'balances':
+        for table in extraction_file.transaction_tables or []:
+            for balance in table.getBalanceStatements() or []:
+                balance = dict(balance)
+                if 'file_extraction_date' in balance:
+                    balance['extraction_date'] = balance.pop('file_extraction_date')
+                yield {column:balance.get(column) for column in BALANCE_COLUMNS}
+    elif kind == 'statements':
+        yield from _table_rows(extraction_file.statement_tables)
+    elif kind == 'credits':
+        yield from _table_rows(extraction_file.credit_tables)
+    else:
+        raise ValueError(f"Unknown kind: {kind}")
+
+class _NdjsonWriter():
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, extraction_file:AccountExtractionFile, kind:str) -> int:
+        return write_records(iter_rows(extraction_file, kind), self.stream)
+
+    def close(self):
+        self.stream.flush()
+
+class _CsvWriter():
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = None
+
+    def write(self, extraction_file:AccountExtractionFile, kind:str) -> int:
+        n_rows = 0
+        for row in iter_rows(extraction_file, kind):
+            if self.writer is None:
+                # The columns of the first row are used for the whole output.
+                self.writer = csv.DictWriter(self.stream, fieldnames=list(row), extrasaction='ignore')
+                self.writer.writeheader()
+            self.writer.writerow(row)
+            n_rows += 1
+        return n_rows
+
+    def close(self):
+        self.stream.flush()
+
+class _ParquetWriter():
+    """
+    Parquet output. Transactions and balances have the same columns whatever the bank, and are
+    written to a single file. The columns of the statement and credit tables are those of each
+    bank: they are written to a file per bank, named after the output, e.g. statements.parquet
+    gives statements.credit_mutuel.parquet.
+    """
+    def __init__(self, path:str):
+        from bankparse.arrow import import_pyarrow, transaction_schema
+        self.pa = import_pyarrow()
+        import pyarrow.parquet as pq
+        self.pq = pq
+        self.path = path
+        self.schemas = {
+            'transactions':transaction_schema(),
+            'balances':self.pa.schema([(column, self.pa.string()) for column in BALANCE_COLUMNS])
+        }
+        self.writers = {}
+
+    def bank_path(self, source_bank:str) -> str:
+        root, extension = os.path.splitext(self.path)
+        return f"{root}.{re.sub(r'[^a-z0-9]+', '_', unidecode(source_bank or 'unknown').lower()).strip('_')}{extension}"
+
+    def write(self, extraction_file:AccountExtractionFile, kind:str) -> int:
+        if kind == 'transactions':
+            tables = [table.to_arrow() for table in extraction_file.transaction_tables or []]
+            path = self.path
+        else:
+            rows = [{key:(None if value is None else str(value)) for key, value in row.items()} for row in iter_rows(extraction_file, kind)]
+            tables = [self.pa.Table.from_pylist(rows, schema=self.schemas.get(kind))] if rows else []
+            path = self.path if kind in self.schemas else self.bank_path(extraction_file.sourceBankLabel)
+
+        n_rows = 0
+        for table in tables:
+            if path not in self.writers:
+                self.writers[path] = self.pq.ParquetWriter(path, self.schemas.get(kind, table.schema))
+            writer = self.writers[path]
+            writer.write_table(table.cast(writer.schema))
+            n_rows += table.num_rows
+        return n_rows
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='bankparse',
+        description="Extract the transactions, balance statements and tables of bank statement pdf files."
+    )
+    parser.add_argument('paths', nargs='+', metavar='PATH', help="pdf files, directories or glob patterns.")
+    parser.add_argument('-k', '--kind', choices=KINDS, default='transactions', help="rows to write (default: transactions).")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='ndjson', help="output format (default: ndjson).")
+    parser.add_argument('-o', '--output', default='-', help="output file, '-' for stdout (default). Required for parquet, a file per bank for statements and credits.")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="number of worker processes (default: number of cpus).")
+    parser.add_argument('--cache', metavar='DIR', default=None, help="directory of a cache of parse results, see bankparse.cache.")
+    parser.add_argument('--low-memory', action='store_true', help="release the layout of each page right after use, to cap the memory used on long files.")
+    parser.add_argument('--stats', action='store_true', help="print the time and throughput of each stage on stderr.")
+    return parser
+
+def main(argv:List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.format == 'parquet' and args.output == '-':
+        parser.error("--output is required for the parquet format.")
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        parser.error("no pdf file found.")
+
+    if args.format == 'parquet':
+        writer = _ParquetWriter(args.output)
+    elif args.format == 'ndjson':
+        # The lines are encoded to UTF-8 bytes once, and written as such.
+        stream = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        writer = _NdjsonWriter(stream)
+    else:
+        stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+        writer = _CsvWriter(stream)
+
+    cache = ParseCache(args.cache) if args.cache is not None else None
+    stats = ParseStats() if args.stats else None
+    n_files, n_errors, n_rows = 0, 0, 0
+    start = time.perf_counter()
+    try:
+        try:
+            for record in iter_parse_many(paths, jobs=args.jobs, cache=cache, stats=stats, low_memory=args.low_memory):
+                n_files += 1
+                if record['status'] != 'ok':
+                    n_errors += 1
+                    print(f"bankparse: {record['file_path']}: {record['error']}", file=sys.stderr)
+                    continue
+                n_rows += writer.write(AccountExtractionFile.deserialize(record['result']), args.kind)
+        finally:
+            writer.close()
+            if args.format != 'parquet' and args.output != '-':
+                stream.close()
+    except BrokenPipeError:
+        # The reader of stdout went away (e.g. piped to head): stop quietly,
+        # without another error when python flushes stdout at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        print(stats.report(throughput=True), file=sys.stderr)
+        print(
+            f"{n_files} files ({n_errors} errors), {n_rows} rows in {elapsed:.3f}s: "
+            f"{n_files / elapsed:.2f} files/s, {n_rows / elapsed:.1f} rows/s",
+            file=sys.stderr
+        )
+
+    return 1 if n_errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
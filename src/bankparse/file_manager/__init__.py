@@ -1,39 +1,161 @@
-import pdfplumber, re
+import asyncio, functools, os, re, weakref
+from concurrent.futures import Executor
 
+from bankparse.pdf_document                         import PdfDocument, ExtractionProfile
+from bankparse.instrumentation                      import instrumented, stage
+from bankparse.cache                                import ParseCache
 from bankparse.file_manager.base_statement_file     import AccountExtractionFile
+from bankparse.file_manager.detection               import BankDetector, register_detector, detect_extraction_class
 
 from bankparse.file_manager.cm_statement_file       import CMAccountExtractionFile
 from bankparse.file_manager.bourso_statement_file   import BoursoAccountExtractionFile
 from bankparse.file_manager.ca_statement_file       import CAAccountExtractionFile
 
+# Detectors are checked in this order when several of them match the first page.
+register_detector(BankDetector(
+    BoursoAccountExtractionFile,
+    lambda word: (word['text'] == 'Boursorama') & (word['top'] > 770),
+    band=(770, None),
+    content_patterns=(b'(Boursorama)',)
+))
+register_detector(BankDetector(
+    CMAccountExtractionFile,
+    lambda word: bool(re.search('CREDIT MUTUEL', word['text'])) & (word['top'] > 780),
+    band=(780, None),
+    content_patterns=(b'(CAISSE DE CREDIT MUTUEL',)
+))
+register_detector(BankDetector(
+    CAAccountExtractionFile,
+    lambda word: (word['text'] == 'CREDIT AGRICOLE') & (word['top'] < 30),
+    band=(0, 30),
+    content_patterns=(b'(CREDIT AGRICOLE)',)
+))
+
 class FileFactory():
     """
     Factory that will provide the user with the right ExtractionFile class.
     """
     @staticmethod
-    def handle_file(file_path:str) -> CAAccountExtractionFile | CMAccountExtractionFile | BoursoAccountExtractionFile:
+    @instrumented('FileFactory.handle_file', bytes=lambda file_path, result: os.path.getsize(file_path))
+    def handle_file(file_path:str, cache:ParseCache = None, page_jobs:int = None, low_memory:bool = False, profile:ExtractionProfile = None, load:bool = False) -> CAAccountExtractionFile | CMAccountExtractionFile | BoursoAccountExtractionFile:
         """
         Static method returning the right ExtractionFile class.
 
         Args:
             file_path (str): path of the pdf file.
+            cache (ParseCache): optional cache of parse results. On a hit, the ExtractionFile
+            class is rebuilt from the cache without reading the pdf file with pdfplumber.
+            page_jobs (int): if given, the pages of the file are extracted over this number of
+            worker processes once the bank is known, see PdfDocument.prefetch. Meant for files
+            with many pages.
+            low_memory (bool): release the layout objects of each page as soon as it has been read,
+            see PdfDocument. Caps the memory used on files with many pages, at the cost of some time.
+            profile (ExtractionProfile): region of the pages and table settings the tables are
+            extracted with, whatever the bank of the file. Defaults to the whole pages and
+            pdfplumber's settings.
+            load (bool): compute every table before the file is closed, see AccountExtractionFile.load,
+            instead of opening it again on first access. Always done when the result is cached.
 
         Returns:
             One of the implemented class within bankparse or None if the file hasn't been recognized. 
+
+        Comments:
+        - The file is opened once: the same parse session is given to the ExtractionFile class.
+        - The bank is recognized with the detectors registered in bankparse.file_manager.detection,
+        other banks can be added with register_detector.
+        """
+        if cache is not None:
+            with stage('cache_get'):
+                key = cache.key(file_path, profile=profile)
+                data = cache.get(key)
+            if data is not None:
+                return AccountExtractionFile.deserialize(dict(data, file_path=file_path))
+
+            output = FileFactory._parse_file(file_path, page_jobs=page_jobs, low_memory=low_memory, profile=profile, load=True)
+            if output is not None:
+                with stage('cache_put'):
+                    cache.put(key, output.serialize())
+            return output
+
+        return FileFactory._parse_file(file_path, page_jobs=page_jobs, low_memory=low_memory, profile=profile, load=load)
+
+    @staticmethod
+    async def handle_file_async(file_path:str, cache:ParseCache = None, executor:Executor = None, limiter:asyncio.Semaphore = None, profile:ExtractionProfile = None) -> CAAccountExtractionFile | CMAccountExtractionFile | BoursoAccountExtractionFile:
+        """
+        Coroutine counterpart of handle_file, for asyncio applications.
+        The parsing runs in an executor, so that the event loop isn't blocked. The file is
+        fully parsed there (see AccountExtractionFile.load) and sent back as builtin types, so
+        that a process pool can be used: pdfplumber's work is CPU-bound and doesn't run in
+        parallel over threads.
+
+        Args:
+            file_path (str): path of the pdf file.
+            cache (ParseCache): optional cache of parse results, see handle_file.
+            executor (Executor): executor running the parsing, e.g. a ProcessPoolExecutor.
+            Defaults to the default executor of the event loop, a pool of threads.
+            limiter (asyncio.Semaphore): acquired during the parsing, so that the number of files
+            parsed at once is bounded, whatever the number of callers. Defaults to a semaphore of
+            the number of cpus, shared by the calls running on the same event loop.
+            profile (ExtractionProfile): see handle_file.
+
+        Returns:
+            One of the implemented class within bankparse or None if the file hasn't been recognized.
+        """
+        loop = asyncio.get_running_loop()
+        if limiter is None:
+            limiter = _default_limiter(loop)
+
+        async with limiter:
+            data = await loop.run_in_executor(executor, functools.partial(_handle_file_serialized, file_path, cache=cache, profile=profile))
+        if data is None:
+            return None
+        return AccountExtractionFile.deserialize(data)
+
+    @staticmethod
+    def _parse_file(file_path:str, page_jobs:int = None, low_memory:bool = False, profile:ExtractionProfile = None, load:bool = False) -> CAAccountExtractionFile | CMAccountExtractionFile | BoursoAccountExtractionFile:
+        with PdfDocument(file_path, low_memory=low_memory) as document:
+            with stage('detect'):
+                extraction_class = detect_extraction_class(document)
+            if extraction_class is None:
+                return None
+            if page_jobs is not None:
+                document.prefetch(
+                    tables=extraction_class.page_tables,
+                    words_settings=extraction_class.page_words_settings,
+                    text=True,
+                    jobs=page_jobs,
+                    profile=profile
+                )
+            output = extraction_class(file_path=file_path, document=document, profile=profile)
+            return output.load() if load else output
+
+    @staticmethod
+    def detect(file_path:str) -> type | None:
         """
-        with pdfplumber.open(file_path) as pdf:
-            first_page_elems = pdf.pages[0].extract_words(
-                use_text_flow=False,
-                keep_blank_chars=True,
-                x_tolerance=1
-            )
-
-        for elem in first_page_elems:
-            if (elem['text'] == 'Boursorama') & (elem['top'] > 770):
-                return BoursoAccountExtractionFile(file_path=file_path)
-            elif bool(re.search('CREDIT MUTUEL', elem['text'])) & (elem['top'] > 780):
-                return CMAccountExtractionFile(file_path=file_path)
-            elif (elem['text'] == 'CREDIT AGRICOLE') & (elem['top'] < 30):
-                return CAAccountExtractionFile(file_path=file_path)
-        
-        return None
\ No newline at end of file
+        Static method returning the ExtractionFile class matching a pdf file, without parsing it.
+
+        Args:
+            file_path (str): path of the pdf file.
+
+        Returns:
+            One of the implemented class within bankparse or None if the file hasn't been recognized.
+        """
+        with PdfDocument(file_path) as document:
+            return detect_extraction_class(document)
+
+# Default limiters of handle_file_async, one per event loop: a semaphore can't be shared by several loops.
+_default_limiters = weakref.WeakKeyDictionary()
+
+def _default_limiter(loop:asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    if loop not in _default_limiters:
+        _default_limiters[loop] = asyncio.Semaphore(os.cpu_count() or 1)
+    return _default_limiters[loop]
+
+def _handle_file_serialized(file_path:str, cache:ParseCache = None, profile:ExtractionProfile = None) -> dict | None:
+    """
+    Parse a file with FileFactory.handle_file and return it serialized, see handle_file_async.
+    """
+    output = FileFactory.handle_file(file_path, cache=cache, profile=profile, load=True)
+    if output is None:
+        return None
+    return output.serialize()
@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from bankparse.file_manager.header import HeaderScanner, StatementHeader
 from bankparse.file_manager.utils import get_text_lines_from_pdf_file
+from bankparse.instrumentation import stage
+from bankparse.ndjson import write_records
+from bankparse.pdf_document import PdfDocument, ExtractionProfile
+from bankparse.table_manager.base_table import Table
+from bankparse.utils import find_subclass
+from itertools import chain
+from typing import Dict, Iterator, List, Tuple
 
 class AccountExtractionFile(ABC):
     """
@@ -15,7 +24,13 @@ class AccountExtractionFile(ABC):
     the format of the statement file, provided by the bank.
 
     Attributes :
+    - sourceBankLabel (str): Name of the bank that issued the file.
     - file_path (str): path of the pdf file.
+    - document (PdfDocument): parse session of the pdf file, shared with the tables
+    so that the file is only opened and laid out once.
+    - profile (ExtractionProfile): region of the pages and table settings the tables are
+    extracted with. Defaults to the whole pages and pdfplumber's settings. A profile is opt-in,
+    given by the caller: candidate profiles of each bank are measured by benchmarks/run.py --profiles.
     - owner (str | None): Extracted owner name. None until parsing is done.
     - extraction_date (str | None): Date of issue of the bank statement
     - content (list[str]) : Content of the pdf file, automatically retrieved 
@@ -23,27 +38,304 @@ class AccountExtractionFile(ABC):
     - transaction_tables, statement_tables, credit_tables (Any): Optional parsed 
     tables contained in the pdf file. Can contain lists of strings, instances of
     concrete table classes (e.g., CABankingTransactionsTable, CMBankingTransactionsTable).
+    They are computed on first access (see build_*_tables), so that getting the owner,
+    the extraction date or the accounts of a file doesn't extract its tables.
+
+    Class attributes:
+    - header_scanner (HeaderScanner): scanner finding the owner, the extraction date and
+    the accounts within the lines of the files of the bank.
+    - page_tables (bool), page_words_settings (dict | None): what the tables of the bank
+    are built from, the tables and/or the words (with these settings) of each page.
+
+    Methods:
+    - load: compute every table at once.
+    - iter_records: iterate over the transactions of the file, built or streamed.
+    - to_ndjson: write the transactions of the file to newline-delimited JSON.
+    - prefetch_pages: extract the pages of the file in parallel worker processes.
+    - scan_header: scan the lines of the file for its owner, extraction date and accounts.
+    - get_owner_and_extract_date: return the owner and the extraction date of the file.
+    - accountIds_NamesMatching: return the accounts of the file.
 
     Comments:
     - Different kind of files wouldn't be available depending of the files that the devs 
     have at hand. Therefore, it may happen that some subclasses and/or methods are
     unavailable at this moment.
     """
+    sourceBankLabel = None
+    header_scanner: HeaderScanner = None
+    page_tables = True
+    page_words_settings = None
+    profile = ExtractionProfile()
+    _header = None
 
-    def __init__(self, file_path:str):
+    def __init__(self, file_path:str, document:PdfDocument = None, profile:ExtractionProfile = None):
         assert '.pdf' in file_path, f"Invalid format : {file_path} isn't a pdf file."
         self.file_path = file_path
+        self.document = document if document is not None else PdfDocument(file_path)
+        if profile is not None:
+            self.profile = profile
         self.owner = None
         self.extraction_date = None
-        self.content = get_text_lines_from_pdf_file(path=self.file_path)
-        self.transaction_tables = None
-        self.statement_tables = None
-        self.credit_tables = None
+        self.content = get_text_lines_from_pdf_file(document=self.document)
+        self._tables = {}
 
-    @abstractmethod
-    def get_owner_and_extract_date():
-        pass
+    def prefetch_pages(self, jobs:int = None):
+        """
+        Extract the pages of the file over a pool of processes, each one laying out a range
+        of pages, see PdfDocument.prefetch. The tables are then built from the extracted pages
+        as usual, in the order of the pages. Worth it for files with many pages.
+
+        Args:
+            - jobs (int): number of worker processes. Defaults to the number of cpus.
+        """
+        self.document.prefetch(
+            tables=self.page_tables,
+            words_settings=self.page_words_settings,
+            jobs=jobs,
+            profile=self.profile
+        )
+
+    @contextmanager
+    def _opened_document(self):
+        """
+        Keep the parse session open during the block, and close it afterwards
+        if it wasn't open before.
+        """
+        was_open = self.document.is_open
+        try:
+            yield self.document.open()
+        finally:
+            if not was_open:
+                self.document.close()
+
+    def _get_tables(self, kind:str, builder):
+        if kind not in self._tables:
+            with self._opened_document(), stage(f"build_{kind}_tables") as building:
+                self._tables[kind] = builder()
+                building.count(
+                    tables=len(self._tables[kind] or []),
+                    rows=sum(len(table.rows) for table in self._tables[kind] or [])
+                )
+        return self._tables[kind]
+
+    @property
+    def transaction_tables(self):
+        return self._get_tables('transaction', self.build_transaction_tables)
+
+    @transaction_tables.setter
+    def transaction_tables(self, value):
+        self._tables['transaction'] = value
+
+    @property
+    def statement_tables(self):
+        return self._get_tables('statement', self.build_statement_tables)
+
+    @statement_tables.setter
+    def statement_tables(self, value):
+        self._tables['statement'] = value
+
+    @property
+    def credit_tables(self):
+        return self._get_tables('credit', self.build_credit_tables)
+
+    @credit_tables.setter
+    def credit_tables(self, value):
+        self._tables['credit'] = value
+
+    def build_transaction_tables(self):
+        """
+        Instance method computing transaction_tables, on first access.
+        """
+        return None
+
+    def build_statement_tables(self):
+        """
+        Instance method computing statement_tables, on first access.
+        """
+        return None
+
+    def build_credit_tables(self):
+        """
+        Instance method computing credit_tables, on first access.
+        """
+        return None
+
+    def load(self) -> 'AccountExtractionFile':
+        """
+        Compute every table of the file now, with the file opened once, instead of
+        on first access.
+
+        Returns:
+            The instance itself.
+        """
+        if all(kind in self._tables for kind in ('transaction', 'statement', 'credit')):
+            return self
+
+        with self._opened_document():
+            self.transaction_tables
+            self.statement_tables
+            self.credit_tables
+        return self
+
+    def iter_records(self) -> Iterator[Dict[str, str]]:
+        """
+        Iterate over the transactions of the file, from the transaction tables if they have
+        been built already. Otherwise the file is read page by page (see iter_transactions)
+        without building them, so that memory doesn't grow with the number of transactions.
+
+        A deserialized file holds its tables: its pdf file isn't read again.
+        """
+        if 'transaction' in self._tables:
+            return chain.from_iterable(table.iter_transactions() for table in self.transaction_tables or [])
+        return self.iter_transactions()
+
+    def to_ndjson(self, output) -> int:
+        """
+        Write the transactions of the file to newline-delimited JSON, one transaction per line,
+        see bankparse.ndjson.write_records and iter_records. Uses orjson if it is installed.
+
+        Args:
+            - output (str | PathLike | stream): path of the file or writable stream.
+
+        Returns:
+            The number of transactions written.
+        """
+        return write_records(self.iter_records(), output)
+
+    def _get_document(self, file_path:str) -> PdfDocument:
+        """
+        Return the parse session of the instance if it covers file_path,
+        a new one otherwise.
+        """
+        if file_path == self.document.file_path:
+            return self.document
+        return PdfDocument(file_path)
+
+    def serialize(self) -> dict:
+        """
+        Method returning the parsed file as a dict of builtin types, that can be pickled
+        or dumped to JSON without any reference to pdfplumber objects.
+        """
+        def serialize_tables(tables):
+            if tables is None:
+                return None
+            return [table.serialize() for table in tables]
+
+        self.load()
+
+        return {
+            'extraction_class':type(self).__name__,
+            'sourceBankLabel':self.sourceBankLabel,
+            'file_path':self.file_path,
+            'owner':self.owner,
+            'extraction_date':self.extraction_date,
+            'accounts':self.accountIds_NamesMatching(pdf_lines=self.content),
+            'content':self.content,
+            'transaction_tables':serialize_tables(self.transaction_tables),
+            'statement_tables':serialize_tables(self.statement_tables),
+            'credit_tables':serialize_tables(self.credit_tables),
+            'profile':[list(self.profile.bbox) if self.profile.bbox is not None else None, self.profile.table_settings]
+        }
+
+    @staticmethod
+    def deserialize(data:dict, document:PdfDocument = None) -> 'AccountExtractionFile':
+        """
+        Rebuild an extraction file from the output of serialize, without reading the pdf file.
+
+        Args:
+            - data (dict): serialized extraction file.
+            - document (PdfDocument): parse session to attach to the instance. A new one,
+            only opened on demand, is created if not given.
+
+        Returns:
+            An instance of the concrete extraction file class named in data.
+        """
+        def deserialize_tables(tables):
+            if tables is None:
+                return None
+            return [
+                Table.deserialize(
+                    dict(table, file_path=data['file_path']) if 'file_path' in table else table
+                ) for table in tables
+            ]
+
+        extraction_class = find_subclass(AccountExtractionFile, data['extraction_class'])
+        output = extraction_class.__new__(extraction_class)
+        output.file_path = data['file_path']
+        output.document = document if document is not None else PdfDocument(data['file_path'])
+        output.owner = data['owner']
+        output.extraction_date = data['extraction_date']
+        output.content = list(data['content']) if data['content'] is not None else None
+        # The header was scanned when the file was parsed: the accounts aren't looked for again.
+        output._header = StatementHeader(
+            data['owner'],
+            data['extraction_date'],
+            [(account['accountId'], account['accountLabel']) for account in data['accounts']]
+        )
+        if data.get('profile') is not None:
+            bbox, table_settings = data['profile']
+            output.profile = ExtractionProfile(tuple(bbox) if bbox is not None else None, table_settings)
+        output._tables = {}
+        output.transaction_tables = deserialize_tables(data['transaction_tables'])
+        output.statement_tables = deserialize_tables(data['statement_tables'])
+        output.credit_tables = deserialize_tables(data['credit_tables'])
+
+        return output
+
+    def scan_header(self, pdf_lines:List[str] = None) -> StatementHeader:
+        """
+        Scan the lines of the file for its owner, extraction date and accounts, in a single pass.
+        The result is kept for the lines of the file, see content.
+
+        Args:
+            - pdf_lines (List[str]): lines to scan. Defaults to the lines of the file.
+        """
+        if pdf_lines is None or pdf_lines is self.content:
+            if self._header is None:
+                self._header = self.header_scanner.scan(self.content)
+            return self._header
+        return self.header_scanner.scan(pdf_lines)
+
+    def get_owner_and_extract_date(self, pdf_lines:List[str] = None) -> Tuple[str, str]:
+        """
+        Instance method to retrieve the owner and the extract date of the file.
+        Particularly used when the class is instancied.
+
+        Args:
+            - pdf_lines (List[str]) : File's lines.
+
+        Returns:
+            - Tuple[owner (str), extract_date (str)] : the owner and the extract date.
+        """
+        header = self.scan_header(pdf_lines)
+        return header.owner, header.extraction_date
+
+    def accountIds_NamesMatching(self, pdf_lines:List[str] = None) -> List[Dict[str, str]]:
+        """
+        Instance method to retrieve the account ids of the statements tables within the file.
+
+        Args:
+            - pdf_lines (List[str]) : File's lines.
+
+        Returns:
+            - List[Dict[str, str]] containing, for each account found, the accountId, the accountLabel and the owner.
+        """
+        return [
+            {
+                'accountId':accountId,
+                'accountLabel':accountLabel,
+                'owner':self.owner
+            } for accountId, accountLabel in self.scan_header(pdf_lines).accounts
+        ]
 
     @abstractmethod
-    def accountIds_NamesMatching():
+    def iter_transactions():
+        """
+        Iterate over the transactions of the file, reading it page by page, so that
+        memory doesn't grow with the number of pages. Labels split over several lines
+        are merged, including across page breaks.
+
+        Returns:
+            An iterator over normalized transactions, see BankTransactionTable.build_transaction.
+        """
         pass
\ No newline at end of file
@@ -1,7 +1,195 @@
 from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.file_manager.header import HeaderScanner, REVERSED_OWNER_PATTERN, DATE_PATTERN as STATEMENT_DATE_PATTERN, IBAN_PATTERN
+from bankparse.instrumentation import instrumented
+from bankparse.pdf_document import PdfDocument, ExtractionProfile, DEFAULT_WORDS_SETTINGS
 from bankparse.table_manager import BoursoBankTransactionTable
-import re, pdfplumber
-from typing import Tuple, List, Dict
+from bankparse.table_manager.normalization import normalize_amount
+import re
+from typing import Tuple, List, Dict, Iterator
+
+DATE_PATTERN = re.compile(r'(\d{2}+/\d{2}+/\d{4}+)')
+
+class BoursoWordStreamParser():
+    """
+    State machine reading the words of a Bourso Bank statement, page by page,
+    and building the rows of its transaction table.
+
+    A transaction starts with its operation date (x0 < 90), followed by its label, its value
+    date (x0 > 370) and its amount (debit if x0 < 500, credit otherwise). The words following
+    the amount are added to the label, until the next transaction or a reference ("RŁf : ...").
+    Dates are only looked for after "MOUVEMENTS" on each page.
+
+    Words are only kept until the row they belong to is complete, so that a label continuing
+    on the next page is merged without holding the words of the whole document. Across a page
+    break, only the words of the Libellé column (90 <= x0 <= 370) are kept, to leave out the
+    footer and the headers of the pages.
+
+    The balances are read in the same pass: the opening balance follows the first "SOLDE"
+    (date 3 words after, amount 4 words after), the closing balance follows the first "Nouveau"
+    (amount 5 words after). Amounts with x0 < 500 are in the Débit column, hence negative.
+
+    Attributes:
+    - balances (Dict[str, List[str]]): 'opening' -> [amount, date] and 'closing' -> [amount],
+    for the balances found so far.
+
+    Methods:
+    - feed_page: read the words of a page and return the rows completed.
+    - close: return the remaining rows, once every page has been read.
+    """
+    HEADERS = ("Date opération", "Libellé", "Valeur", "Débit", "Crédit")
+    # trigger word -> (balance, number of words to read after the trigger)
+    BALANCE_TRIGGERS = {
+        'SOLDE':('opening', 4),
+        'Nouveau':('closing', 5)
+    }
+
+    def __init__(self):
+        self._rows = []
+        self._date_ope_found = False
+        self._first_date_valeur_found = False
+        self._ref_found = False
+        self._awaiting_amount = False
+        self._since_date_ope = []
+        self._since_amount = []
+        self._ref_capture = None
+        self._anchor_on_page = False
+        self.balances = {}
+        self._balance_captures = []
+
+    @staticmethod
+    def _in_label_column(word:Dict) -> bool:
+        return 90 <= word['x0'] <= 370
+
+    @staticmethod
+    def _is_ref(word:Dict) -> bool:
+        return any((
+            'RŁf' == word['text'],
+            ('Nouveau' == word['text'] and word['x0'] > 683.0),
+            ('A' == word['text'] and word['x0'] > 739.0)
+        ))
+
+    def _completed_rows(self) -> List[List[str]]:
+        # Only the last row can still change, unless a reference is being read.
+        if self._ref_capture is not None or len(self._rows) < 2:
+            return []
+        output = self._rows[:-1]
+        self._rows = self._rows[-1:]
+        return output
+
+    def _capture(self, text:str):
+        capture = self._ref_capture
+        capture['words'].append(text)
+        if capture['first'] and text == ':':
+            capture['first'] = False
+            return
+        capture['row'][1] += ' '.join([''] + capture['words'])
+        self._ref_capture = None
+
+    def _scan_balances(self, word:Dict):
+        pending = []
+        for balance, length, following in self._balance_captures:
+            following.append(word)
+            if len(following) < length:
+                pending.append((balance, length, following))
+                continue
+            amount = following[-1]
+            amount = ('-' if amount['x0'] < 500 else '') + amount['text']
+            self.balances[balance] = [amount, following[2]['text']] if balance == 'opening' else [amount]
+        self._balance_captures = pending
+
+        for trigger, (balance, length) in self.BALANCE_TRIGGERS.items():
+            if trigger in word['text'] and balance not in self.balances and all(
+                    capture[0] != balance for capture in self._balance_captures
+                ):
+                self._balance_captures.append((balance, length, []))
+
+    def feed_page(self, words:List[Dict]) -> List[List[str]]:
+        """
+        Args:
+            - words (List[Dict]): words of the page, as returned by pdfplumber's extract_words.
+
+        Returns:
+            The rows of the transaction table completed while reading the page.
+        """
+        output = []
+        mouvements_en_eur_found = False
+        self._anchor_on_page = False
+        self._since_date_ope = [word for word in self._since_date_ope if self._in_label_column(word)]
+        self._since_amount = [word for word in self._since_amount if self._in_label_column(word)]
+        for word in words:
+            text = word['text']
+            self._scan_balances(word)
+
+            if self._awaiting_amount:
+                amount = normalize_amount(text).strip()
+                self._rows[-1][3:] = [amount, ''] if word['x0'] < 500 else ['', amount]
+                self._awaiting_amount = False
+                self._anchor_on_page = True
+                self._since_amount = []
+                continue
+
+            if self._ref_capture is not None:
+                self._capture(text)
+
+            # Find "MOUVEMENTS EN EUR" to know that we can check for transactions.
+            if text == 'MOUVEMENTS' and word['x0'] > 360:
+                mouvements_en_eur_found = True
+                continue
+
+            # Check if we found a date (after MOUVEMENTS, and in Date opération or Date valeur)
+            is_date = DATE_PATTERN.match(text)
+            if mouvements_en_eur_found and is_date and (word['x0'] < 90 or word['x0'] > 370): # to avoid retrieving date within Libellé
+                # Check if we have a "Date opération"
+                if word['x0'] < 90:
+                    if self._first_date_valeur_found and not self._ref_found:
+                        self._rows[-1][1] += ' '.join([''] + [word['text'] for word in self._since_amount])
+                    self._rows.append([is_date.group(), '', '', '', ''])
+                    self._date_ope_found = True
+                    self._anchor_on_page = True
+                    self._since_date_ope = []
+                    self._ref_found = False
+                    output += self._completed_rows()
+                    self._since_amount.append(word)
+                    continue
+
+                # Check if we have a "Date valeur"
+                elif self._date_ope_found:
+                    self._rows[-1][1] += ' '.join([''] + [word['text'] for word in self._since_date_ope]).strip()
+                    self._rows[-1][2] = text
+                    self._awaiting_amount = True
+                    self._date_ope_found = False
+                    self._first_date_valeur_found = True
+                    continue
+
+            elif self._is_ref(word) and self._rows and self._first_date_valeur_found:
+                self._ref_capture = {'row':self._rows[-1], 'words':[word['text'] for word in self._since_amount] + [text], 'first':True}
+                self._ref_found = True
+
+            if mouvements_en_eur_found and (self._anchor_on_page or self._in_label_column(word)):
+                self._since_date_ope.append(word)
+                self._since_amount.append(word)
+
+        return output
+
+    def close(self) -> List[List[str]]:
+        """
+        Returns:
+            The rows of the transaction table that haven't been returned yet.
+        """
+        if self._ref_capture is not None:
+            capture = self._ref_capture
+            capture['row'][1] += ' '.join([''] + capture['words'])
+            self._ref_capture = None
+
+        output = self._rows
+        self._rows = []
+        return output
+
+def _parse_account(line:str) -> Tuple[str, str] | None:
+    rib = IBAN_PATTERN.search(line)
+    if rib is None:
+        return None
+    return rib.group(), "Compte espèces"
 
 class BoursoAccountExtractionFile(AccountExtractionFile):
     """
@@ -13,24 +201,62 @@ class BoursoAccountExtractionFile(AccountExtractionFile):
 
     Methods :
     - get_owner_and_extract_date
+    - parse_words
     - get_transaction_tables
     - accountIds_NamesMatching
+    - iter_transactions
     """
-    def __init__(self, file_path:str):
-        super().__init__(file_path=file_path)
+    sourceBankLabel = 'Bourso Bank'
+    header_scanner = HeaderScanner(
+        owner_pattern=REVERSED_OWNER_PATTERN,
+        date_pattern=STATEMENT_DATE_PATTERN,
+        parse_account=_parse_account,
+        max_accounts=1
+    )
+    page_tables = False
+    page_words_settings = DEFAULT_WORDS_SETTINGS
+
+    @instrumented('BoursoAccountExtractionFile.__init__')
+    def __init__(self, file_path:str, document:PdfDocument = None, profile:ExtractionProfile = None):
+        super().__init__(file_path=file_path, document=document, profile=profile)
         self.owner, self.extraction_date = self.get_owner_and_extract_date(pdf_lines=self.content)
+        if document is None:
+            self.document.close()
+
+    def build_transaction_tables(self) -> List[BoursoBankTransactionTable]:
         accountIds_NamesMatching_results = self.accountIds_NamesMatching(pdf_lines=self.content)
-        
-        self.transaction_tables = [
+        content, balances = self.parse_words(file_path=self.file_path)
+        return [
                 BoursoBankTransactionTable(
-                    content = self.get_transaction_tables(file_path=file_path),
+                    content = content,
                     owner = self.owner,
                     accountId = accountIds_NamesMatching_results[0]['accountId'],
                     extraction_date = self.extraction_date,
-                    file_path=file_path
+                    file_path=self.file_path,
+                    balances=balances
                 )
             ]
 
+    def parse_words(self, file_path:str) -> Tuple[List[List[str]], Dict[str, List[str]]]:
+        """
+        Instance method reading the words of the file once, page by page, for both
+        the transaction table and the balances, see BoursoWordStreamParser.
+
+        Args:
+            - file_path (str) : path of the file containing the transaction table.
+
+        Returns:
+            - Tuple[rows (List[List[str]]), balances (Dict[str, List[str]])] : the rows of the
+            transaction table, headers first, and the balances found, see BoursoWordStreamParser.balances.
+        """
+        parser = BoursoWordStreamParser()
+        output = [list(BoursoWordStreamParser.HEADERS)]
+        for words in self._get_document(file_path).iter_page_words(bbox=self.profile.bbox, **DEFAULT_WORDS_SETTINGS):
+            output += parser.feed_page(words)
+        output += parser.close()
+
+        return output, parser.balances
+
     def get_transaction_tables(self, file_path:str) -> List[List[str]] | None:
         """
         Instance method to retrieve transaction tables within the file.
@@ -48,158 +274,26 @@ class BoursoAccountExtractionFile(AccountExtractionFile):
             A row if represented by a list of strings.
             The first row of a table represents the headers.
         """
-        with pdfplumber.open(file_path) as pdf:
-            words = {}
-            for i, page in enumerate(pdf.pages):
-                words_in_page = page.extract_words(
-                    use_text_flow=False,
-                    keep_blank_chars=True,
-                    x_tolerance=1
-                )
-
-                words[f"page_{i+1}"] = words_in_page
-
-        mouvements_en_eur_found = False
-        date_ope_found = False
-        first_date_valeur_found = False
-        ref_found = False
-
-        output = {
-            "Date opération":[],
-            "Libellé":[],
-            "Valeur":[],
-            "Débit":[],
-            "Crédit":[]
-        }
-
-        for page, words_list in words.items():
-            mouvements_en_eur_found = False
-            for i, word in enumerate(words_list):
-                # Find "MOUVEMENTS EN EUR" to know that we can check for transactions.
-                if all((word['text'] == 'MOUVEMENTS', word['x0'] > 360)):
-                    mouvements_en_eur_found = True
-                    continue
-
-                # Check if we found a date (after MOUVEMENTS, and in Date opération or Date valeur)
-                is_date = re.match(r'(\d{2}+/\d{2}+/\d{4}+)', word['text'])
-                if all((mouvements_en_eur_found, is_date, any((word['x0'] < 90, word['x0'] > 370)))): # to avoid retrieving date within Libellé
-                    # Check if we have a "Date opération"
-                    if (word['x0'] < 90):
-                        output['Date opération'].append(is_date.group())
-                        output['Libellé'].append('')
-                        date_ope_found = True
-                        date_ope_index = i
-
-                        if first_date_valeur_found and not ref_found:
-                            output['Libellé'][-2] += ' '.join([''] + [word['text'] for word in words_list[transaction_amount_index+1:i]])
-                        
-                        ref_found = False
-
-                    # Check if we have a "Date valeur"
-                    elif all((word['x0'] > 370, date_ope_found)):
-                        output['Libellé'][-1] += ' '.join([''] + [word['text'] for word in words_list[date_ope_index+1:i]]).strip()
-                        output['Valeur'].append(word['text'])
-
-                        transaction_amount = words_list[i+1]
-                        transaction_amount_index = i+1
-
-                        if transaction_amount['x0'] < 500:
-                            output['Débit'].append(transaction_amount['text'].replace('.', '').replace(',', '.').strip())
-                            output['Crédit'].append('')
-                        else:
-                            output['Débit'].append('')
-                            output['Crédit'].append(transaction_amount['text'].replace('.', '').replace(',', '.').strip())
-
-                        date_ope_found = False
-                        first_date_valeur_found = True
-                    
-                    continue
-
-                elif any(('RŁf' == word['text'], ('Nouveau' == word['text'] and word['x0'] > 683.0), ('A' == word['text'] and word['x0'] > 739.0))):
-                    window_size = 2 if words_list[i+1]['text'] != ':' else 3
-                    output['Libellé'][-1] += ' '.join([''] + [word['text'] for word in words_list[transaction_amount_index+1:i+window_size]])
-                    ref_found = True
-
-        headers = list(output.keys())
-        values = list(output.values())
-        output = []
-
-        for i in range(len(values[0])):
-            output.append([val[i] for val in values])
+        return self.parse_words(file_path)[0]
 
-        output.insert(0, headers)
-        return output
-
-    def get_owner_and_extract_date(self, pdf_lines:List[str]) -> Tuple[str, str]:
+    def iter_transactions(self) -> Iterator[Dict[str, str]]:
         """
-        Instance method to retrieve the owner and the extract date of the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - file_path (str) : path of the file containing the transaction tables.
+        Instance method iterating over the transactions of the file, page by page.
+        Only the words of the current page are held in memory.
 
         Returns:
-            - Tuple[owner (str), extract_date (str)] : the owner and the extract date.
-        """
-        owner = None
-        extract_date = None
-
-        owner_pattern = re.compile(
-            r"\b"
-            r"(M|Mme|Mlle)\.?\s+"
-            r"([A-Za-zÀ-ÖØ-öø-ÿ'-]+)\s+"
-            r"([A-Za-zÀ-ÖØ-öø-ÿ'-]+)"
-            r"\b"
-        )
-
-        extract_date_pattern = re.compile(
-            r"\b\d{1,2}(?:\s+|/)"
-            r"(?:\d{1,2}|[a-zéèêûùàâîôç]+)"
-            r"(?:\s+|/)\d{4}\b",
-            flags=re.IGNORECASE
-        )
-
-        for line in pdf_lines:
-            if extract_date is None:
-                d = extract_date_pattern.search(line)
-                if d:
-                    extract_date = d.group(0)
-                    day, month, year = extract_date.split('/')
-                    extract_date = f"{year}-{month}-{day}"
-
-            if owner is None:
-                m = owner_pattern.search(line)
-                if m:
-                    owner = f"{m.group(3).capitalize()} {m.group(2).capitalize()}"
-
-            if owner and extract_date:
-                return owner, extract_date
-
-        return owner, extract_date
-
-    def accountIds_NamesMatching(self, pdf_lines: List[str] = None) -> List[Dict[str, str]]:
+            An iterator over normalized transactions, see BankTransactionTable.build_transaction.
         """
-        Instance method to retrieve the account ids of the statement tables within the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - file_path (str) : path of the file containing the transaction tables.
+        accountId = self.accountIds_NamesMatching(pdf_lines=self.content)[0]['accountId']
 
-        Returns:
-            - List[Dict[str, str]] containing, for each match found, the accountId, the accountLabel and the owner.
-            We assumed that each extraction file contains a unique table.
-        """
-        for line in pdf_lines:
-            rib = re.search(r"\bFR(?:\s?\d){25}\b", line)
-            if rib:
-                break
+        def build_transactions(rows):
+            return [
+                BoursoBankTransactionTable.build_transaction(
+                    line, self.sourceBankLabel, self.owner, self.extraction_date, accountId
+                ) for line in rows
+            ]
 
-        return [
-            dict(
-                {
-                    'accountId' : rib.group(),
-                    'accountLabel' : "Compte espèces",
-                    'owner' : self.owner
-                }
-            )
-        ]
\ No newline at end of file
+        parser = BoursoWordStreamParser()
+        for words in self.document.iter_page_words(bbox=self.profile.bbox, **DEFAULT_WORDS_SETTINGS):
+            yield from build_transactions(parser.feed_page(words))
+        yield from build_transactions(parser.close())
@@ -1,8 +1,18 @@
 from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.file_manager.header import HeaderScanner, OWNER_PATTERN, TEXT_DATE_PATTERN, ACCOUNT_ID_PATTERN
+from bankparse.file_manager.utils import merge_continuation_rows
+from bankparse.instrumentation import instrumented
+from bankparse.pdf_document import PdfDocument, ExtractionProfile
 from bankparse.table_manager import CABankTransactionTable
-from bankparse.utils import matches, month_from_name
-import re, pdfplumber
-from typing import Tuple, List, Dict
+import re
+from typing import Tuple, List, Dict, Iterator
+
+ACCOUNT_LINE_PATTERN = re.compile(r"n°\s*\d{11}")
+
+def _parse_account(line:str) -> Tuple[str, str] | None:
+    if ('FRAIS' in line) or not ACCOUNT_LINE_PATTERN.search(line):
+        return None
+    return ACCOUNT_ID_PATTERN.search(line).group(), line.split(' n° ')[0]
 
 class CAAccountExtractionFile(AccountExtractionFile):
     """
@@ -16,12 +26,27 @@ class CAAccountExtractionFile(AccountExtractionFile):
     - get_owner_and_extract_date
     - get_transaction_tables
     - accountIds_NamesMatching
+    - iter_transactions
     """
-    def __init__(self, file_path:str):
-        super().__init__(file_path=file_path)
+    sourceBankLabel = 'Crédit Agricole'
+    header_scanner = HeaderScanner(
+        owner_pattern=OWNER_PATTERN,
+        date_pattern=TEXT_DATE_PATTERN,
+        parse_account=_parse_account,
+        max_accounts=1,
+        date_after_owner=True
+    )
+
+    @instrumented('CAAccountExtractionFile.__init__')
+    def __init__(self, file_path:str, document:PdfDocument = None, profile:ExtractionProfile = None):
+        super().__init__(file_path=file_path, document=document, profile=profile)
         self.owner, self.extraction_date = self.get_owner_and_extract_date(pdf_lines=self.content)
+        if document is None:
+            self.document.close()
+
+    def build_transaction_tables(self) -> List[CABankTransactionTable]:
         accountIds_NamesMatching_results = self.accountIds_NamesMatching()
-        self.transaction_tables = [
+        return [
                 CABankTransactionTable(
                     content = self.get_transaction_tables(self.file_path),
                     owner = self.owner,
@@ -38,6 +63,7 @@ class CAAccountExtractionFile(AccountExtractionFile):
         
         Args:
             - file_path (str) : path of the file containing the transaction table.
+            The tables are read from the parse session of the instance when it covers this file.
 
         Returns:
             A list containing all of the rows. We assumed that each extraction file contains a unique table.
@@ -45,99 +71,52 @@ class CAAccountExtractionFile(AccountExtractionFile):
             A row if represented by a list of strings.
             The first row of a table represents the headers.
         """
-        with pdfplumber.open(file_path) as pdf:
-            transaction_tables = []
-            for page in pdf.pages:
-                transaction_tables += page.extract_tables()
-            
-            output = []
-            seen = set()
-            for table in transaction_tables:
-                for line in table:
-                    if (line[2] == 'Total des opérations') or (str(line) in seen):
-                        pass
-                    else:
-                        seen.add(str(line))
-                        output.append(line[:-1])
-
-        return output
-
-    def get_owner_and_extract_date(self, pdf_lines:List[str]) -> Tuple[str, str]:
-        """
-        Instance method to retrieve the owner and the extract date of the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - file_path (str) : path of the file containing the transaction tables.
-
-        Returns:
-            - Tuple[owner (str), extract_date (str)] : the owner and the extract date.
-        """
-        owner_found=False
+        transaction_tables = self._get_document(file_path).get_tables(
+            bbox=self.profile.bbox,
+            table_settings=self.profile.table_settings
+        )
 
-        for line in pdf_lines:
-            owner_pattern = (
-                r"(?:^|\s)"
-                r"(?P<sexe>M|Mme|Mlle)\.?\s+"
-                r"(?P<prenom>[A-Za-zÀ-ÖØ-öø-ÿ'-]+)\s+"
-                r"(?P<nom>[A-Za-zÀ-ÖØ-öø-ÿ'-]+)"
-            )
-            
-            extract_date_pattern = (
-                r"(?P<day>\d{1,2})\s+"
-                r"(?P<month>[a-zéèêûùàâîôç]+)\s+"
-                r"(?P<year>\d{4})"
-            )
-
-            if not owner_found:
-                m = (re.search(owner_pattern, line))
-                if m:
-                    owner = ' '.join([m.group("prenom").capitalize(), m.group("nom").capitalize()])
-                    owner_found=True
-            else:
-                d = re.search(extract_date_pattern, line, flags=re.IGNORECASE)
-                if d:
-                    day = d.group("day").zfill(2)
-                    month = month_from_name(d.group("month"))
-                    year = d.group("year")
-                    extract_date = f"{year}-{month}-{day}"
+        output = []
+        seen = set()
+        for table in transaction_tables:
+            for line in table:
+                if (line[2] == 'Total des opérations') or (str(line) in seen):
+                    pass
+                else:
+                    seen.add(str(line))
+                    output.append(line[:-1])
 
-                    return owner, extract_date
+        return output
 
-    def accountIds_NamesMatching(self, pdf_lines: List[str] = None) -> List[Dict[str, str]]:
+    def iter_transactions(self) -> Iterator[Dict[str, str]]:
         """
-        Instance method to retrieve the account ids of the statements tables within the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - file_path (str) : path of the file containing the transaction tables.
+        Instance method iterating over the transactions of the file, page by page.
+        Only the tables of the current page are held in memory. Rows repeated across
+        pages are skipped as in get_transaction_tables, keeping hashes of the rows
+        already seen instead of the rows themselves.
 
         Returns:
-            - List[Dict[str, str]] containing, for each match found, the accountId, the accountLabel and the owner.
-            We assumed that each extraction file contains a unique table.
+            An iterator over normalized transactions, see BankTransactionTable.build_transaction.
         """
-        def accountIdsLines(text_lines: List[str]):
-            for line in text_lines:
-                if all(
-                        (
-                        matches(r"(?:n°\s*)\d{11}", line),
-                        ('FRAIS' not in line)
-                        )
-                    ):
-                    return line
-                else:
-                    pass
+        accountId = self.accountIds_NamesMatching()[0]['accountId']
 
-        if not pdf_lines:
-            pdf_lines = self.content
-        account_id_line = accountIdsLines(pdf_lines)
+        def rows():
+            seen = set()
+            headers_found = False
+            for tables in self.document.iter_page_tables(bbox=self.profile.bbox, table_settings=self.profile.table_settings):
+                for table in tables:
+                    for line in table:
+                        line_hash = hash(str(line))
+                        if (line[2] == 'Total des opérations') or (line_hash in seen):
+                            continue
+                        seen.add(line_hash)
+                        if not headers_found:
+                            headers_found = True
+                            continue
+                        yield line[:-1], accountId
 
-        return [
-            dict(
-                {
-                    'accountId' : re.search(r"\d{11}", account_id_line).group(),
-                    'accountLabel' : account_id_line.split(' n° ')[0],
-                    'owner' : self.owner
-                }
-            )
-        ]
\ No newline at end of file
+        for line, accountId in merge_continuation_rows(rows(), CABankTransactionTable):
+            if CABankTransactionTable.is_transaction_row(line):
+                yield CABankTransactionTable.build_transaction(
+                    line, self.sourceBankLabel, self.owner, self.extraction_date, accountId
+                )
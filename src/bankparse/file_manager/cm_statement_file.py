@@ -1,8 +1,20 @@
 from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.file_manager.header import HeaderScanner, OWNER_PATTERN, TEXT_DATE_PATTERN, ACCOUNT_ID_PATTERN
+from bankparse.file_manager.utils import merge_continuation_rows
+from bankparse.instrumentation import instrumented
+from bankparse.pdf_document import PdfDocument, ExtractionProfile
 from bankparse.table_manager import CMBankTransactionTable, CMBankStatementTable, CMCreditStatementTable
-from bankparse.utils import matches, month_from_name
-import re, pdfplumber
-from typing import Tuple, List, Dict
+import re
+from typing import Tuple, List, Dict, Iterator
+
+ACCOUNT_LINE_PATTERN = re.compile(r"N°\s*\d{11}")
+
+def _parse_account(line:str) -> Tuple[str, str] | None:
+    if ('FRAIS' in line) or not ACCOUNT_LINE_PATTERN.search(line):
+        return None
+    if '°' in line:
+        return ACCOUNT_ID_PATTERN.search(line).group(), line.split(' N° ')[0]
+    return ACCOUNT_ID_PATTERN.search(line).group(), ACCOUNT_ID_PATTERN.sub('', line.split(' EUR')[0]).strip()
 
 class CMAccountExtractionFile(AccountExtractionFile):
     """
@@ -14,16 +26,32 @@ class CMAccountExtractionFile(AccountExtractionFile):
 
     Methods :
     - get_owner_and_extract_date
+    - classify_tables
     - get_transaction_tables
     - get_statement_tables
     - get_credit_tables
     - accountIds_NamesMatching
+    - iter_transactions
     """
-    def __init__(self, file_path:str):
-        super().__init__(file_path=file_path)
+    sourceBankLabel = 'Crédit Mutuel'
+    header_scanner = HeaderScanner(
+        owner_pattern=OWNER_PATTERN,
+        date_pattern=TEXT_DATE_PATTERN,
+        parse_account=_parse_account,
+        date_after_owner=True
+    )
+    _classified_tables = None
+
+    @instrumented('CMAccountExtractionFile.__init__')
+    def __init__(self, file_path:str, document:PdfDocument = None, profile:ExtractionProfile = None):
+        super().__init__(file_path=file_path, document=document, profile=profile)
         self.owner, self.extraction_date = self.get_owner_and_extract_date(pdf_lines=self.content)
+        if document is None:
+            self.document.close()
+
+    def build_transaction_tables(self) -> List[CMBankTransactionTable]:
         accountIds_NamesMatching_results = self.accountIds_NamesMatching()
-        self.transaction_tables = [
+        return [
                 CMBankTransactionTable(
                     content = table,
                     owner = self.owner,
@@ -31,7 +59,9 @@ class CMAccountExtractionFile(AccountExtractionFile):
                     extraction_date = self.extraction_date
                 ) for i, table in enumerate(self.get_transaction_tables(self.file_path))
             ]
-        self.statement_tables = [
+
+    def build_statement_tables(self) -> List[CMBankStatementTable]:
+        return [
                 CMBankStatementTable(
                     content = table,
                     owner = self.owner,
@@ -39,7 +69,9 @@ class CMAccountExtractionFile(AccountExtractionFile):
                     extraction_date = self.extraction_date
                 ) for table in self.get_statement_tables(self.file_path)
             ]
-        self.credit_tables = [
+
+    def build_credit_tables(self) -> List[CMCreditStatementTable]:
+        return [
                 CMCreditStatementTable(
                     content = table,
                     owner = self.owner,
@@ -48,6 +80,38 @@ class CMAccountExtractionFile(AccountExtractionFile):
                 ) for table in self.get_credit_tables(self.file_path)
             ]
 
+    def classify_tables(self, file_path:str) -> Dict[str, List[List[List[str]]]]:
+        """
+        Instance method sorting every table of the file into transaction, statement
+        and credit tables, in a single extraction pass.
+        The result is kept, so that the get_*_tables methods share the same pass.
+
+        Args:
+            - file_path (str) : path of the file containing the tables.
+
+        Returns:
+            - Dict[str, List] with the keys 'transaction', 'statement' and 'credit',
+            each one containing a list of tables.
+        """
+        if self._classified_tables is not None and self._classified_tables[0] == file_path:
+            return self._classified_tables[1]
+
+        output = {
+            'transaction':[],
+            'statement':[],
+            'credit':[]
+        }
+        for table in self._get_document(file_path).get_tables(bbox=self.profile.bbox, table_settings=self.profile.table_settings):
+            if table[0][0] == 'Date':
+                output['transaction'].append(table)
+            elif len(table[0]) == 3:
+                output['statement'].append(table)
+            elif len(table[0]) == 4:
+                output['credit'].append(table)
+
+        self._classified_tables = (file_path, output)
+        return output
+
     def get_transaction_tables(self, file_path:str) -> List[List[List[str]]] | None:
         """
         Instance method to retrieve transaction tables within the file.
@@ -62,12 +126,9 @@ class CMAccountExtractionFile(AccountExtractionFile):
             A row if represented by a list of strings.
             The first row of a table represents the headers.
         """
-        with pdfplumber.open(file_path) as pdf:
-            transaction_tables = []
-            for page in pdf.pages:
-                transaction_tables += page.extract_tables()
-        
-        return [table for table in transaction_tables if (table[0][0] == 'Date')]
+        return [
+            [line.copy() for line in table] for table in self.classify_tables(file_path)['transaction']
+        ]
 
     def get_statement_tables(self, path:str) -> List[List[List[str]]] | None:
         """
@@ -83,12 +144,9 @@ class CMAccountExtractionFile(AccountExtractionFile):
             A row if represented by a list of strings.
             The first row of a table represents the headers.
         """
-        with pdfplumber.open(path) as pdf:
-            statement_tables = []
-            for page in pdf.pages:
-                statement_tables += page.extract_tables()
-        
-        return [table for table in statement_tables if (table[0][0] != 'Date') and (len(table[0]) == 3)]
+        return [
+            [line.copy() for line in table] for table in self.classify_tables(path)['statement']
+        ]
     
     def get_credit_tables(self, path:str) -> List[List[List[str]]] | None:
         """
@@ -104,95 +162,32 @@ class CMAccountExtractionFile(AccountExtractionFile):
             A row if represented by a list of strings.
             The first row of a table represents the headers.
         """
-        with pdfplumber.open(path) as pdf:
-            statement_tables = []
-            for page in pdf.pages:
-                statement_tables += page.extract_tables()
-        
-        return [table for table in statement_tables if (table[0][0] != 'Date') and (len(table[0]) == 4)]
-
-    def get_owner_and_extract_date(self, pdf_lines:List[str]) -> Tuple[str, str]:
-        """
-        Instance method to retrieve the owner and the extract date of the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - pdf_lines (List[str]) : File's lines.
+        return [
+            [line.copy() for line in table] for table in self.classify_tables(path)['credit']
+        ]
 
-        Returns:
-            - Tuple[owner (str), extract_date (str)] : the owner and the extract date.
+    def iter_transactions(self) -> Iterator[Dict[str, str]]:
         """
-        owner_found=False
-
-        for line in pdf_lines:
-            owner_pattern = (
-                r"(?:^|\s)"
-                r"(?P<sexe>M|Mme|Mlle)\.?\s+"
-                r"(?P<prenom>[A-Za-zÀ-ÖØ-öø-ÿ'-]+)\s+"
-                r"(?P<nom>[A-Za-zÀ-ÖØ-öø-ÿ'-]+)"
-            )
-            
-            extract_date_pattern = (
-                r"(?P<day>\d{1,2})\s+"
-                r"(?P<month>[a-zéèêûùàâîôç]+)\s+"
-                r"(?P<year>\d{4})"
-            )
-
-            if not owner_found:
-                m = (re.search(owner_pattern, line))
-                if m:
-                    owner = ' '.join([m.group("prenom").capitalize(), m.group("nom").capitalize()])
-                    owner_found=True
-            else:
-                d = re.search(extract_date_pattern, line, flags=re.IGNORECASE)
-                if d:
-                    day = d.group("day").zfill(2)
-                    month = month_from_name(d.group("month"))
-                    year = d.group("year")
-                    extract_date = f"{year}-{month}-{day}"
-
-                    return owner, extract_date
-
-    def accountIds_NamesMatching(self, pdf_lines: List[str] = None) -> List[Dict[str, str]]:
-        """
-        Instance method to retrieve the account ids of the statements tables within the file.
-        Particularly used when the class is instancied.
-        
-        Args:
-            - pdf_lines (List[str]) : File's lines.
+        Instance method iterating over the transactions of the file, page by page.
+        Only the tables of the current page are held in memory.
 
         Returns:
-            - List[Dict[str, str]] containing, for each match found, the accountId, the accountLabel and the owner.            
+            An iterator over normalized transactions, see BankTransactionTable.build_transaction.
         """
-        def accountIdsLines(text_lines: List[str]):
-            line_to_del = []
-            for i, line in enumerate(text_lines):
-                if all(
-                        (
-                        matches(r"(?:N°\s*)\d{11}", line),
-                        ('FRAIS' not in line)
-                        )
-                    ):
-                    pass
-                else:
-                    line_to_del.insert(0, i)
-            
-            for j in line_to_del:
-                del text_lines[j]
-
-            return text_lines
-
-        if not pdf_lines:
-            pdf_lines = self.content
-        cleaned_lines = accountIdsLines(pdf_lines)
-
-        return [
-            dict(
-                {
-                    'accountId' : re.search(r"\d{11}", line_text).group(),
-                    'accountLabel' : line_text.split(' N° ')[0] if '°' in line_text else re.sub(r"\d{11}", string = line_text.split(' EUR')[0], repl="").strip(),
-                    'owner' : self.owner
-                }
-            )
-            for line_text in cleaned_lines
-        ]
\ No newline at end of file
+        accountIds = [account['accountId'] for account in self.accountIds_NamesMatching()]
+
+        def rows():
+            table_index = -1
+            for tables in self.document.iter_page_tables(bbox=self.profile.bbox, table_settings=self.profile.table_settings):
+                for table in tables:
+                    if table[0][0] != 'Date':
+                        continue
+                    table_index += 1
+                    for line in table[1:]:
+                        yield line, accountIds[table_index]
+
+        for line, accountId in merge_continuation_rows(rows(), CMBankTransactionTable):
+            if CMBankTransactionTable.is_transaction_row(line):
+                yield CMBankTransactionTable.build_transaction(
+                    line, self.sourceBankLabel, self.owner, self.extraction_date, accountId
+                )
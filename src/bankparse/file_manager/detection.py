@@ -0,0 +1,125 @@
+from bankparse.pdf_document import PdfDocument, DEFAULT_WORDS_SETTINGS
+from typing import Callable, Dict, List
+import math, re
+
+class BankDetector():
+    """
+    Signature of the statement files of a bank, used by FileFactory to pick the
+    right ExtractionFile class.
+
+    A detector can declare several signatures, from the cheapest to the most expensive:
+    - metadata_patterns: regex searched in the metadata of the pdf file (e.g. {'Producer': ...}).
+    - content_patterns: bytes searched in the raw content stream of the first page, e.g. the
+    literal string of a text the bank prints on every statement. A hit is only a hint: the
+    text may appear anywhere, e.g. in the label of a transfer, so the band is still checked.
+    Strings drawn with an encoded font don't appear as such: the band is used alone.
+    - band: (top, bottom) band of the first page, in points. Only this band of the page is laid
+    out, and its words are given to match_word. None stands for the edge of the page.
+    match_word is also used on every word of the first page, when the cheaper
+    signatures are ambiguous. It checks the position of the word, not only its text.
+
+    Attributes:
+    - extraction_class (type): AccountExtractionFile subclass returned when the file matches.
+    - match_word (Callable): predicate on a word, as returned by pdfplumber's extract_words.
+    - band (tuple | None)
+    - metadata_patterns (Dict[str, str])
+    - content_patterns (tuple[bytes])
+    """
+    def __init__(
+            self,
+            extraction_class:type,
+            match_word:Callable[[Dict], bool],
+            band:tuple[float | None, float | None] = None,
+            metadata_patterns:Dict[str, str] = None,
+            content_patterns:tuple[bytes, ...] = ()
+        ):
+        self.extraction_class = extraction_class
+        self.match_word = match_word
+        self.band = band
+        self.metadata_patterns = metadata_patterns or {}
+        self.content_patterns = tuple(content_patterns)
+
+    def match_metadata(self, metadata:Dict) -> bool:
+        if not self.metadata_patterns:
+            return False
+        return all(
+            re.search(pattern, str(metadata.get(field, '')))
+            for field, pattern in self.metadata_patterns.items()
+        )
+
+    def match_content(self, content:bytes) -> bool:
+        return any(pattern in content for pattern in self.content_patterns)
+
+    def match_band(self, document:PdfDocument) -> bool:
+        """
+        Args:
+            - document (PdfDocument): parse session of the file. Only the band of the first
+            page is laid out, and cached by the document.
+        """
+        if self.band is None:
+            return False
+
+        top = 0 if self.band[0] is None else self.band[0]
+        bottom = math.inf if self.band[1] is None else self.band[1]
+        words = document.get_page_words(0, bbox=(0, top, math.inf, bottom), **DEFAULT_WORDS_SETTINGS)
+        return any(self.match_word(word) for word in words)
+
+DETECTORS: List[BankDetector] = []
+
+def register_detector(detector:BankDetector, first:bool = False):
+    """
+    Register the detector of a bank, so that FileFactory recognizes its files.
+
+    Args:
+        - detector (BankDetector)
+        - first (bool): give the detector precedence over the ones already registered.
+    """
+    if first:
+        DETECTORS.insert(0, detector)
+    else:
+        DETECTORS.append(detector)
+
+def detect_extraction_class(document:PdfDocument) -> type | None:
+    """
+    Find the ExtractionFile class matching a pdf file.
+    The signatures of the registered detectors are checked from the cheapest to the
+    most expensive:
+    - the metadata, decisive if a single detector matches.
+    - the content stream of the first page, only decoded if a detector has content patterns.
+    The detectors whose text is found are confirmed, in order, by their band.
+    - the bands of every detector, decisive if a single detector matches.
+    When none of them is conclusive, the words of the whole first page are read in order and
+    the first word matching a detector decides.
+
+    The band checks only lay out their band of the first page, not the whole page.
+
+    Args:
+        - document (PdfDocument): parse session of the file.
+
+    Returns:
+        The AccountExtractionFile subclass, None if the file hasn't been recognized.
+    """
+    def single(candidates:List[BankDetector]) -> type | None:
+        return candidates[0].extraction_class if len(candidates) == 1 else None
+
+    metadata = document.metadata
+    extraction_class = single([detector for detector in DETECTORS if detector.match_metadata(metadata)])
+    if extraction_class is not None:
+        return extraction_class
+
+    if any(detector.content_patterns for detector in DETECTORS):
+        content = document.get_page_raw_content(0)
+        for detector in DETECTORS:
+            if detector.match_content(content) and detector.match_band(document):
+                return detector.extraction_class
+
+    extraction_class = single([detector for detector in DETECTORS if detector.match_band(document)])
+    if extraction_class is not None:
+        return extraction_class
+
+    for word in document.get_page_words(0, **DEFAULT_WORDS_SETTINGS):
+        for detector in DETECTORS:
+            if detector.match_word(word):
+                return detector.extraction_class
+
+    return None
@@ -0,0 +1,132 @@
+from bankparse.utils import month_from_name
+from typing import Callable, Iterable, List, NamedTuple, Tuple
+import re
+
+NAME = r"[A-Za-zÀ-ÖØ-öø-ÿ'-]+"
+
+# 'M. JEAN DUPONT': civility, first name and last name.
+OWNER_PATTERN = re.compile(
+    r"(?:^|\s)"
+    r"(?:M|Mme|Mlle)\.?\s+"
+    rf"(?P<first_name>{NAME})\s+"
+    rf"(?P<last_name>{NAME})"
+)
+
+# 'M. DUPONT JEAN': civility, last name and first name.
+REVERSED_OWNER_PATTERN = re.compile(
+    r"\b"
+    r"(?:M|Mme|Mlle)\.?\s+"
+    rf"(?P<last_name>{NAME})\s+"
+    rf"(?P<first_name>{NAME})"
+    r"\b"
+)
+
+# '31 janvier 2024'
+TEXT_DATE_PATTERN = re.compile(
+    r"(?P<day>\d{1,2})\s+"
+    r"(?P<month>[a-zéèêûùàâîôç]+)\s+"
+    r"(?P<year>\d{4})",
+    flags=re.IGNORECASE
+)
+
+# '31/01/2024' or '31 janvier 2024'
+DATE_PATTERN = re.compile(
+    r"\b(?P<day>\d{1,2})(?:\s+|/)"
+    r"(?P<month>\d{1,2}|[a-zéèêûùàâîôç]+)"
+    r"(?:\s+|/)(?P<year>\d{4})\b",
+    flags=re.IGNORECASE
+)
+
+ACCOUNT_ID_PATTERN = re.compile(r"\d{11}")
+
+IBAN_PATTERN = re.compile(r"\bFR(?:\s?\d){25}\b")
+
+class StatementHeader(NamedTuple):
+    """
+    Information found in the header of a statement file.
+
+    - owner (str | None): owner of the accounts, 'First Last'.
+    - extraction_date (str | None): date of issue of the statement, under yyyy-mm-dd format.
+    - accounts (List[Tuple[str, str]]): (accountId, accountLabel) of each account, in order of appearance.
+    """
+    owner: str | None
+    extraction_date: str | None
+    accounts: List[Tuple[str, str]]
+
+class HeaderScanner():
+    """
+    Scanner of the lines of a statement file, finding the owner, the extraction date
+    and the accounts in a single pass. The lines aren't modified.
+
+    Attributes:
+    - owner_pattern (re.Pattern): pattern with first_name and last_name groups.
+    - date_pattern (re.Pattern): pattern with day, month (number or french name) and year groups.
+    - parse_account (Callable): function returning the (accountId, accountLabel) of a line,
+    None if the line doesn't describe an account.
+    - max_accounts (int | None): number of accounts after which the scan stops. None to read every line.
+    - date_after_owner (bool): only look for the extraction date in the lines after the owner.
+
+    Methods:
+    - scan: scan the lines of a file.
+    """
+    def __init__(
+            self,
+            owner_pattern:re.Pattern,
+            date_pattern:re.Pattern,
+            parse_account:Callable[[str], Tuple[str, str] | None],
+            max_accounts:int | None = None,
+            date_after_owner:bool = False
+        ):
+        self.owner_pattern = owner_pattern
+        self.date_pattern = date_pattern
+        self.parse_account = parse_account
+        self.max_accounts = max_accounts
+        self.date_after_owner = date_after_owner
+
+    def _parse_date(self, line:str) -> str | None:
+        for match in self.date_pattern.finditer(line):
+            month = match.group('month')
+            if month.isdigit():
+                month = month.zfill(2)
+            else:
+                try:
+                    month = month_from_name(month)
+                except KeyError:
+                    continue
+            return f"{match.group('year')}-{month}-{match.group('day').zfill(2)}"
+        return None
+
+    def scan(self, lines:Iterable[str] | None) -> StatementHeader:
+        """
+        Args:
+            - lines (Iterable[str]): lines of the file.
+
+        Returns:
+            - StatementHeader
+        """
+        owner = None
+        extraction_date = None
+        accounts = []
+
+        for line in lines or ():
+            owner_line = False
+            if owner is None:
+                match = self.owner_pattern.search(line)
+                if match:
+                    owner = f"{match.group('first_name').capitalize()} {match.group('last_name').capitalize()}"
+                    owner_line = True
+
+            if extraction_date is None and not (self.date_after_owner and (owner is None or owner_line)):
+                extraction_date = self._parse_date(line)
+
+            accounts_done = self.max_accounts is not None and len(accounts) >= self.max_accounts
+            if not accounts_done:
+                account = self.parse_account(line)
+                if account is not None:
+                    accounts.append(account)
+                    accounts_done = self.max_accounts is not None and len(accounts) >= self.max_accounts
+
+            if owner is not None and extraction_date is not None and accounts_done:
+                break
+
+        return StatementHeader(owner, extraction_date, accounts)
@@ -1,22 +1,51 @@
-import pdfplumber
-from typing import List
+from bankparse.pdf_document import PdfDocument
+from typing import List, Iterable, Iterator, Tuple, Any
 
-def get_text_lines_from_pdf_file(path: str) -> List[str]:
+def get_text_lines_from_pdf_file(path: str = None, document: PdfDocument = None) -> List[str]:
     """
     Retrieve lines of text from the pdf file.
 
     Args:
         - path: path of the pdf file.
+        - document: already opened parse session of the file. Used instead of path if given.
 
     Returns:
         List containing the lines, None if there isn't any
     """
-
-    with pdfplumber.open(path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
+    if document is None:
+        with PdfDocument(path) as document:
+            text = document.get_text()
+    else:
+        text = document.get_text()
 
     if text=="":
         return None
-    return text.split('\n')
\ No newline at end of file
+    return text.split('\n')
+
+def merge_continuation_rows(rows: Iterable[Tuple[List[str], Any]], table_class: type) -> Iterator[Tuple[List[str], Any]]:
+    """
+    Merge the rows continuing the label of the previous row, over a stream of rows.
+    Rows are only kept until the next row is known, so that a label split over two
+    tables (e.g. across a page break) is merged too.
+
+    Args:
+        - rows: iterable of (row, key) tuples. key is given back with the merged row.
+        - table_class: BankTransactionTable subclass providing is_continuation_row and LABEL_COLUMN.
+
+    Returns:
+        An iterator over the merged (row, key) tuples. Rows are copied, not modified in place.
+    """
+    label = table_class.LABEL_COLUMN
+    pending = None
+    for line, key in rows:
+        if table_class.is_continuation_row(line):
+            if pending is not None:
+                pending[0][label] += ' ' + line[label]
+            continue
+
+        if pending is not None:
+            yield pending
+        pending = (list(line), key)
+
+    if pending is not None:
+        yield pending
@@ -0,0 +1,155 @@
+from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.ledger import Ledger
+from bankparse.table_manager.base_table import BankTransactionTable
+from bankparse.table_manager.normalization import normalize_date
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, List, Tuple
+
+def _day(value:str | date) -> str:
+    """
+    Date under yyyy-mm-dd format, the format of the dates of the index.
+    """
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+def _cents(amount:str | float) -> int:
+    if amount == '' or amount is None:
+        return 0
+    return round(float(amount) * 100)
+
+class _AccountHistory():
+    """
+    Transactions and balance statements of an account, sorted by date.
+
+    Attributes:
+    - dates (List[str]): operation date of each transaction.
+    - transactions (List[dict]): the transactions, in the order of dates.
+    - totals (List[int]): totals[i] is the sum, in cents, of the credits minus the debits
+    of the first i transactions.
+    - balance_dates (List[str]), balances (List[int]): date and balance, in cents,
+    of each balance statement.
+    """
+    __slots__ = ('dates', 'transactions', 'totals', 'balance_dates', 'balances')
+
+    def __init__(self, transactions:List[dict], balances:Dict[str, int]):
+        self.transactions = transactions
+        self.dates = [transaction['operation_date'] for transaction in transactions]
+        self.totals = list(accumulate(
+            (_cents(transaction['credit']) - _cents(transaction['debit']) for transaction in transactions),
+            initial=0
+        ))
+        self.balance_dates = sorted(balances)
+        self.balances = [balances[day] for day in self.balance_dates]
+
+    def span(self, start:str | None, end:str | None) -> Tuple[int, int]:
+        """
+        Positions of the first and after the last transaction between start and end, included.
+        """
+        lo = bisect_left(self.dates, start) if start is not None else 0
+        hi = bisect_right(self.dates, end) if end is not None else len(self.dates)
+        return lo, max(lo, hi)
+
+class AccountIndex():
+    """
+    In-memory index of the transactions and balance statements of parsed files, per account
+    and by date, answering range and balance queries without scanning the tables.
+
+    The transactions are consolidated as in a Ledger (overlapping statements don't count twice),
+    then kept per account sorted by operation date, along with the cumulative sum of their
+    amounts. A range of dates is found by binary search, and the balance on a date is the
+    balance statement nearest before it (or after it, if there is none before), adjusted
+    by the sum of the transactions in between: every query costs O(log n).
+
+    Attributes:
+    - accounts (List[str]): ids of the indexed accounts.
+
+    Methods:
+    - transactions: return the transactions of an account between two dates.
+    - net_flow: return the credits minus the debits of an account between two dates.
+    - balance: return the balance of an account at the end of a date.
+
+    Comments:
+    - Dates are given under yyyy-mm-dd format or as datetime.date, bounds included.
+    - Balance statements are read from getBalanceStatements: the balance of a statement date
+    is the balance at the end of that day. Their date is also the one of the transactions
+    of the day, operation dates being the ones used for every query.
+    - The index isn't updated: build a new one to take new files into account.
+    """
+    def __init__(self, sources:Iterable[AccountExtractionFile | BankTransactionTable] = ()):
+        ledger = Ledger()
+        balances: Dict[str, Dict[str, int]] = {}
+
+        for source in sources:
+            tables = (source.transaction_tables or []) if isinstance(source, AccountExtractionFile) else [source]
+            for table in tables:
+                ledger.append(table)
+                for statement in table.getBalanceStatements() or []:
+                    extraction_date = statement.get('extraction_date', statement.get('file_extraction_date'))
+                    day = normalize_date(statement['statement_date'], extraction_date)
+                    balances.setdefault(str(statement['accountId']), {})[day] = _cents(statement['balance'])
+
+        self._histories: Dict[str, _AccountHistory] = {
+            accountId:_AccountHistory(ledger.get_transactions(accountId), balances.get(accountId, {}))
+            for accountId in ledger.accounts
+        }
+        for accountId, account_balances in balances.items():
+            if accountId not in self._histories:
+                self._histories[accountId] = _AccountHistory([], account_balances)
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self._histories)
+
+    def _history(self, accountId:str) -> _AccountHistory:
+        if accountId not in self._histories:
+            raise KeyError(f"Unknown account: {accountId}")
+        return self._histories[accountId]
+
+    def transactions(self, accountId:str, start:str | date = None, end:str | date = None) -> List[dict]:
+        """
+        Args:
+            - accountId (str)
+            - start, end (str | date): first and last operation dates, included.
+            None for no bound.
+
+        Returns:
+            - List[dict]: the normalized transactions, by operation date,
+            see BankTransactionTable.build_transaction.
+        """
+        history = self._history(accountId)
+        lo, hi = history.span(_day(start) if start is not None else None, _day(end) if end is not None else None)
+        return history.transactions[lo:hi]
+
+    def net_flow(self, accountId:str, start:str | date = None, end:str | date = None) -> float:
+        """
+        Returns:
+            The credits minus the debits of the transactions between start and end, included.
+        """
+        history = self._history(accountId)
+        lo, hi = history.span(_day(start) if start is not None else None, _day(end) if end is not None else None)
+        return (history.totals[hi] - history.totals[lo]) / 100
+
+    def balance(self, accountId:str, on:str | date) -> float | None:
+        """
+        Args:
+            - accountId (str)
+            - on (str | date): date of the balance, at the end of the day.
+
+        Returns:
+            The balance of the account, or None if no balance statement of the account has been found.
+        """
+        history = self._history(accountId)
+        if not history.balance_dates:
+            return None
+
+        on = _day(on)
+        i = max(bisect_right(history.balance_dates, on) - 1, 0)
+        # Transactions after the statement date are added, the ones after the date asked for are removed.
+        return (
+            history.balances[i]
+            + history.totals[bisect_right(history.dates, on)]
+            - history.totals[bisect_right(history.dates, history.balance_dates[i])]
+        ) / 100
@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+import functools, time
+
+COUNTERS = ('pages', 'tables', 'rows', 'bytes')
+
+class ParseStats():
+    """
+    Wall time and counters of each stage of the parsing, aggregated over every file
+    parsed while the stats are collected (see collect).
+
+    Stages are named after what they do: 'pdf_open', 'extract_text', 'extract_words',
+    'extract_tables', 'detect', 'FileFactory.handle_file', 'CAAccountExtractionFile.__init__',
+    'build_transaction_tables', 'table.get_dataframe', ... The time of a stage includes the
+    time of the stages it runs, e.g. FileFactory.handle_file includes pdf_open.
+
+    Attributes:
+    - stages (Dict[str, Dict[str, float]]): per stage, the number of 'calls', the total
+    'seconds' and the 'pages', 'tables', 'rows' and 'bytes' processed.
+
+    Methods:
+    - record: add a call of a stage.
+    - merge: add the stats of another ParseStats, e.g. collected in another process.
+    - to_dict / from_dict: convert from and to builtin types.
+    - report: format the stats as a table.
+    """
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage:str, seconds:float = 0.0, calls:int = 1, **counters:float):
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = dict.fromkeys(('calls', 'seconds') + COUNTERS, 0)
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        for name, value in counters.items():
+            entry[name] += value
+
+    def merge(self, other:'ParseStats | Dict') -> 'ParseStats':
+        stages = other.stages if isinstance(other, ParseStats) else other
+        for stage, entry in stages.items():
+            self.record(stage, **entry)
+        return self
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {stage:dict(entry) for stage, entry in self.stages.items()}
+
+    @classmethod
+    def from_dict(cls, data:Dict[str, Dict[str, float]]) -> 'ParseStats':
+        return cls().merge(data)
+
+    def report(self, throughput:bool = False) -> str:
+        """
+        Args:
+            - throughput (bool): add the number of pages and rows processed per second of each stage.
+
+        Returns:
+            The stats as a text table, the slowest stages first.
+        """
+        def per_second(entry:Dict[str, float], name:str) -> str:
+            return f"{entry[name] / entry['seconds']:>10.1f}" if entry['seconds'] and entry[name] else f"{'':>10}"
+
+        header = f"{'stage':<40} {'calls':>8} {'seconds':>10} " + ' '.join(f"{name:>10}" for name in COUNTERS)
+        if throughput:
+            header += f" {'pages/s':>10} {'rows/s':>10}"
+        lines = [header]
+        for stage, entry in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            line = (
+                f"{stage:<40} {entry['calls']:>8} {entry['seconds']:>10.3f} "
+                + ' '.join(f"{entry[name]:>10}" for name in COUNTERS)
+            )
+            if throughput:
+                line += f" {per_second(entry, 'pages')} {per_second(entry, 'rows')}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+_stats: ParseStats | None = None
+
+def get_stats() -> ParseStats | None:
+    """
+    Returns:
+        The stats being collected, None if instrumentation is disabled.
+    """
+    return _stats
+
+@contextmanager
+def collect(stats:ParseStats = None) -> Iterator[ParseStats]:
+    """
+    Collect the stats of the parsing done within the block.
+
+    Args:
+        - stats (ParseStats): stats to add to, so that they aggregate over several blocks.
+        A new one is created if not given.
+
+    Example:
+        with collect() as stats:
+            FileFactory.handle_file(path, load=True)
+        print(stats.report())
+    """
+    global _stats
+    previous = _stats
+    _stats = stats if stats is not None else ParseStats()
+    try:
+        yield _stats
+    finally:
+        _stats = previous
+
+class _Stage():
+    __slots__ = ('stats', 'name', 'counters', 'start')
+
+    def __init__(self, stats:ParseStats, name:str, counters:Dict[str, float]):
+        self.stats = stats
+        self.name = name
+        self.counters = counters
+
+    def count(self, **counters:float):
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.record(self.name, time.perf_counter() - self.start, **self.counters)
+
+class _NullStage():
+    __slots__ = ()
+
+    def count(self, **counters:float):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+def stage(name:str, **counters:float) -> _Stage | _NullStage:
+    """
+    Context manager recording the time of a block as a stage. Counters known at the end
+    of the block can be added with the count method of the returned object.
+    When instrumentation is disabled, a shared object doing nothing is returned.
+    """
+    if _stats is None:
+        return _NULL_STAGE
+    return _Stage(_stats, name, counters)
+
+def instrumented(name:str, **counters:Callable[[Any, Any], float]) -> Callable:
+    """
+    Decorator recording each call of a function as a stage.
+
+    Args:
+        - name (str): name of the stage.
+        - counters: functions computing a counter from the first argument of the call
+        (e.g. self) and its result. Only called when instrumentation is enabled.
+    """
+    def decorator(function:Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            stats = _stats
+            if stats is None:
+                return function(*args, **kwargs)
+
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            first = args[0] if args else None
+            stats.record(
+                name,
+                time.perf_counter() - start,
+                **{counter:compute(first, result) for counter, compute in counters.items()}
+            )
+            return result
+        return wrapper
+    return decorator
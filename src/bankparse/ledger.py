@@ -0,0 +1,134 @@
+from bankparse.file_manager.base_statement_file import AccountExtractionFile
+from bankparse.table_manager.base_table import BankTransactionTable
+from typing import Dict, Iterable, Iterator, List, Tuple
+import pandas as pd
+
+class Ledger():
+    """
+    Consolidated transactions of many statement files, per account.
+
+    Consecutive statements overlap and a statement can be downloaded twice: every
+    transaction is identified by a key made of its dates, label and amounts, and
+    a transaction is only added when the ledger doesn't already hold it.
+    A transaction appearing n times within a single statement (e.g. two identical
+    payments the same day) is kept n times: the key includes the occurrence of the
+    transaction within its statement.
+
+    Attributes:
+    - accounts (List[str]): ids of the accounts within the ledger.
+
+    Methods:
+    - append: add the transactions of a statement file or a table.
+    - extend: add the transactions of many statement files or tables.
+    - iter_transactions: iterate over the transactions of the ledger, by date.
+    - get_transactions: return the transactions of the ledger, by date.
+    - get_dataframe: return the transactions of the ledger as a pandas DataFrame.
+
+    Comments:
+    - Adding a statement only costs the size of the statement, the ledger is never rebuilt.
+    """
+    def __init__(self, sources:Iterable[AccountExtractionFile | BankTransactionTable] = ()):
+        self._transactions: Dict[str, List[dict]] = {}
+        self._counts: Dict[str, Dict[Tuple, int]] = {}
+        self._sorted: Dict[str, bool] = {}
+        self.extend(sources)
+
+    @staticmethod
+    def transaction_key(transaction:dict) -> Tuple:
+        """
+        Key identifying a transaction within its account, whatever the statement it comes from.
+        """
+        return (
+            transaction['operation_date'],
+            transaction['value_date'],
+            ' '.join(transaction['label'].split()),
+            transaction['debit'],
+            transaction['credit']
+        )
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self._transactions)
+
+    def __len__(self) -> int:
+        return sum(len(transactions) for transactions in self._transactions.values())
+
+    def append(self, source:AccountExtractionFile | BankTransactionTable) -> int:
+        """
+        Add the transactions of a statement file or a table, skipping the ones already in the ledger.
+        The transactions of a file are taken from its tables if they have been built, e.g. for a
+        deserialized file, see AccountExtractionFile.iter_records.
+
+        Args:
+            - source (AccountExtractionFile | BankTransactionTable)
+
+        Returns:
+            The number of transactions added.
+        """
+        # Occurrences of each key within the source, so that repeated identical
+        # transactions of a statement aren't mistaken for overlaps.
+        occurrences: Dict[Tuple, int] = {}
+        added = 0
+
+        for transaction in source.iter_records():
+            accountId = transaction['accountId']
+            key = self.transaction_key(transaction)
+            occurrence = occurrences.get((accountId, key), 0)
+            occurrences[(accountId, key)] = occurrence + 1
+
+            counts = self._counts.setdefault(accountId, {})
+            if occurrence < counts.get(key, 0):
+                continue
+            counts[key] = occurrence + 1
+
+            transactions = self._transactions.setdefault(accountId, [])
+            if transactions and transactions[-1]['operation_date'] > transaction['operation_date']:
+                self._sorted[accountId] = False
+            transactions.append(transaction)
+            added += 1
+
+        return added
+
+    def extend(self, sources:Iterable[AccountExtractionFile | BankTransactionTable]) -> int:
+        """
+        Add the transactions of many statement files or tables, see append.
+
+        Returns:
+            The number of transactions added.
+        """
+        return sum(self.append(source) for source in sources)
+
+    def _sorted_transactions(self, accountId:str) -> List[dict]:
+        transactions = self._transactions[accountId]
+        if not self._sorted.get(accountId, True):
+            # Statements are mostly appended in order: sorting the runs is close to linear.
+            transactions.sort(key=lambda transaction: transaction['operation_date'])
+            self._sorted[accountId] = True
+        return transactions
+
+    def iter_transactions(self, accountId:str = None) -> Iterator[dict]:
+        """
+        Iterate over the transactions of the ledger, account by account and by operation date.
+
+        Args:
+            - accountId (str): only iterate over the transactions of this account.
+
+        Returns:
+            An iterator over the normalized transactions, see BankTransactionTable.build_transaction.
+        """
+        accountIds = self.accounts if accountId is None else [accountId]
+        for accountId in accountIds:
+            if accountId in self._transactions:
+                yield from self._sorted_transactions(accountId)
+
+    def get_transactions(self, accountId:str = None) -> List[dict]:
+        """
+        Return the transactions of the ledger, see iter_transactions.
+        """
+        return list(self.iter_transactions(accountId))
+
+    def get_dataframe(self, accountId:str = None) -> pd.DataFrame:
+        """
+        Return the transactions of the ledger as a pandas DataFrame, see iter_transactions.
+        """
+        return pd.DataFrame(self.get_transactions(accountId))
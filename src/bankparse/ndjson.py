@@ -0,0 +1,64 @@
+from typing import Any, Callable, Dict, Iterable
+import io, json, os
+
+# Lines encoded before each write to the output.
+BATCH_SIZE = 1024
+
+def _json_dumps(record:Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def import_encoder() -> Callable[[Dict[str, Any]], bytes]:
+    """
+    Return the fastest JSON encoder available: orjson if it is installed (an optional
+    dependency of bankparse, see bankparse[json]), the json module otherwise.
+    Both encode a record to the same UTF-8 bytes: compact, without escaping non-ASCII
+    characters, and with str() of the values that aren't JSON types.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return _json_dumps
+
+    def orjson_dumps(record:Dict[str, Any]) -> bytes:
+        return orjson.dumps(record, default=str)
+    return orjson_dumps
+
+def write_records(records:Iterable[Dict[str, Any]], output, encoder:Callable[[Dict[str, Any]], bytes] = None) -> int:
+    """
+    Write records to newline-delimited JSON, one record per line, as they come: only a batch
+    of lines is held in memory at once, whatever the number of records.
+
+    Args:
+        - records (Iterable[Dict[str, Any]]): records to write, e.g. the transactions of
+        BankTransactionTable.iter_transactions.
+        - output (str | PathLike | stream): path of the file, created or overwritten, or a writable
+        stream. Binary streams (open(path, 'wb'), socket.makefile('wb'), ...) get UTF-8 bytes,
+        text streams (sys.stdout, ...) get str.
+        - encoder: function encoding a record to bytes. Defaults to import_encoder().
+
+    Returns:
+        The number of records written.
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'wb') as stream:
+            return write_records(records, stream, encoder=encoder)
+
+    if encoder is None:
+        encoder = import_encoder()
+    text = isinstance(output, io.TextIOBase)
+
+    n_records = 0
+    batch = []
+    for record in records:
+        batch.append(encoder(record))
+        if len(batch) == BATCH_SIZE:
+            n_records += _write_batch(output, batch, text)
+            batch = []
+    if batch:
+        n_records += _write_batch(output, batch, text)
+    return n_records
+
+def _write_batch(stream, lines:list[bytes], text:bool) -> int:
+    data = b'\n'.join(lines) + b'\n'
+    stream.write(data.decode('utf-8') if text else data)
+    return len(lines)
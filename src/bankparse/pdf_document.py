@@ -0,0 +1,415 @@
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+from bankparse.instrumentation import stage, collect, get_stats
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, NamedTuple, Tuple
+import os
+
+DEFAULT_WORDS_SETTINGS = {
+    'use_text_flow': False,
+    'keep_blank_chars': True,
+    'x_tolerance': 1
+}
+
+# Tables drawn with lines, as in the statements of Crédit Agricole and Crédit Mutuel: the
+# cells are only looked for from the lines of the page, whose ends meet exactly.
+RULED_TABLE_SETTINGS = {
+    'vertical_strategy': 'lines',
+    'horizontal_strategy': 'lines',
+    'snap_tolerance': 1,
+    'join_tolerance': 1,
+    'intersection_tolerance': 1
+}
+
+class ExtractionProfile(NamedTuple):
+    """
+    Where and how the tables and words of the pages of a statement are extracted.
+
+    - bbox (tuple | None): (x0, top, x1, bottom) region of each page holding the data, clipped
+    to the page, so that math.inf stands for the right or bottom edge. None for the whole page.
+    - table_settings (dict | None): table_settings given to pdfplumber's extract_tables.
+    None for pdfplumber's defaults.
+    """
+    bbox: Tuple[float, float, float, float] | None = None
+    table_settings: Dict[str, Any] | None = None
+
+def _settings_key(settings:Dict[str, Any] | None) -> tuple:
+    return tuple(sorted(settings.items())) if settings else ()
+
+def _words_key(page_number:int, bbox:tuple | None, settings:Dict[str, Any]) -> tuple:
+    key = (page_number, _settings_key(settings))
+    if bbox is not None:
+        key += (tuple(bbox),)
+    return key
+
+def _tables_key(page_number:int, bbox:tuple | None, table_settings:Dict[str, Any] | None) -> int | tuple:
+    if bbox is None and not table_settings:
+        return page_number
+    return (page_number, _settings_key(table_settings), tuple(bbox) if bbox is not None else None)
+
+def _crop(page, bbox:tuple | None):
+    """
+    Region of a page, bbox being clipped to the page.
+    """
+    if bbox is None:
+        return page
+    x0, top, x1, bottom = page.bbox
+    return page.crop((max(bbox[0], x0), max(bbox[1], top), min(bbox[2], x1), min(bbox[3], bottom)))
+
+class PdfDocument():
+    """
+    Parse session over a single pdf file.
+
+    The file is opened once with pdfplumber and every layout result (text, words, tables)
+    is cached per page. The session is meant to be shared between FileFactory, the
+    extraction files and the tables, so that a statement is only laid out once.
+
+    The pdfplumber handle is opened on first use. Once closed, cached results stay
+    available and the file is only reopened if something that hasn't been cached yet
+    is requested.
+
+    pdfplumber keeps the layout objects (chars, lines, rects, ...) of every page it has read
+    until the handle is closed, which takes several MB per page. In low memory mode, they
+    are released as soon as a result has been extracted from the page, so that the memory
+    used by pdfplumber stays around one page's worth whatever the number of pages. The cost
+    is that a page is laid out again for each kind of result (text, words, tables) asked for.
+
+    Attributes:
+    - file_path (str): path of the pdf file.
+    - low_memory (bool): release the layout objects of each page right after use.
+
+    Methods:
+    - metadata, get_page_size, get_page_raw_content: cheap information, that doesn't need
+    any layout analysis.
+    - get_page_text, get_page_words, get_page_tables: per page results, optionally for
+    a region of the page and with given settings, see ExtractionProfile.
+    - get_text, get_words, get_tables: results for the whole document.
+    - iter_page_words, iter_page_tables: stream the results page by page, with bounded memory.
+    - prefetch: extract the pages in parallel worker processes, filling the per page caches.
+    - open: open the pdfplumber handle.
+    - close: release the pdfplumber handle, keeping the cached results.
+    """
+    def __init__(self, file_path:str, low_memory:bool = False):
+        self.file_path = file_path
+        self.low_memory = low_memory
+        self._pdf = None
+        self._page_count = None
+        self._metadata = None
+        self._texts = {}
+        self._words = {}
+        self._tables = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def pdf(self):
+        """
+        pdfplumber handle of the file, opened on first access.
+        """
+        if self._pdf is None:
+            with stage('pdf_open') as opening:
+                self._pdf = pdfplumber.open(self.file_path)
+                opening.count(bytes=os.path.getsize(self.file_path))
+        return self._pdf
+
+    @property
+    def is_open(self) -> bool:
+        return self._pdf is not None
+
+    def open(self) -> 'PdfDocument':
+        """
+        Open the pdfplumber handle if it isn't already.
+        """
+        self.pdf
+        return self
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._page_count = len(self.pdf.pages)
+        return self._page_count
+
+    def close(self):
+        """
+        Close the pdfplumber handle. Cached results are kept.
+        """
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Metadata of the pdf file (Producer, Creator, Title, ...).
+        """
+        if self._metadata is None:
+            self._metadata = self.pdf.metadata
+        return self._metadata
+
+    def _release(self, page):
+        """
+        In low memory mode, drop the layout objects pdfplumber keeps about a page.
+        """
+        if self.low_memory:
+            page.close()
+
+    def get_page_size(self, page_number:int) -> tuple[float, float]:
+        """
+        Returns:
+            The (width, height) of the page, in points.
+        """
+        page = self.pdf.pages[page_number]
+        return page.width, page.height
+
+    def get_page_raw_content(self, page_number:int) -> bytes:
+        """
+        Returns:
+            The decoded content streams of the page, without any layout analysis.
+        """
+        with stage('raw_content', pages=1) as reading:
+            contents = self.pdf.pages[page_number].page_obj.contents
+            output = b''.join(resolve1(stream).get_data() for stream in contents)
+            reading.count(bytes=len(output))
+        return output
+
+    def get_page_text(self, page_number:int) -> str:
+        """
+        Args:
+            - page_number (int): index of the page, starting at 0.
+
+        Returns:
+            The text of the page, as returned by pdfplumber's extract_text.
+        """
+        if page_number not in self._texts:
+            with stage('extract_text', pages=1):
+                page = self.pdf.pages[page_number]
+                self._texts[page_number] = page.extract_text()
+                self._release(page)
+        return self._texts[page_number]
+
+    def get_page_words(self, page_number:int, bbox:tuple[float, float, float, float] = None, **settings) -> List[Dict[str, Any]]:
+        """
+        Args:
+            - page_number (int): index of the page, starting at 0.
+            - bbox (tuple): optional (x0, top, x1, bottom) region of the page, clipped to the page.
+            Only the words of this region are laid out.
+            - settings: keyword arguments given to pdfplumber's extract_words.
+            Results are cached per region and set of settings.
+
+        Returns:
+            The words of the page. The returned dicts are shared with the cache and
+            shouldn't be modified.
+        """
+        key = _words_key(page_number, bbox, settings)
+        if key not in self._words:
+            with stage('extract_words', pages=1):
+                page = self.pdf.pages[page_number]
+                self._words[key] = _crop(page, bbox).extract_words(**settings)
+                self._release(page)
+        return self._words[key]
+
+    def get_page_tables(self, page_number:int, bbox:tuple[float, float, float, float] = None, table_settings:Dict[str, Any] = None) -> List[List[List[str]]]:
+        """
+        Args:
+            - page_number (int): index of the page, starting at 0.
+            - bbox (tuple): optional (x0, top, x1, bottom) region of the page, clipped to the page.
+            Only the tables of this region are looked for.
+            - table_settings (Dict[str, Any]): table_settings given to pdfplumber's extract_tables.
+            Results are cached per region and settings.
+
+        Returns:
+            The tables of the page, as returned by pdfplumber's extract_tables.
+        """
+        key = _tables_key(page_number, bbox, table_settings)
+        if key not in self._tables:
+            with stage('extract_tables', pages=1) as extraction:
+                page = self.pdf.pages[page_number]
+                self._tables[key] = _crop(page, bbox).extract_tables(table_settings)
+                self._release(page)
+                extraction.count(tables=len(self._tables[key]))
+        return self._tables[key]
+
+    def prefetch(
+            self,
+            tables:bool = True,
+            words_settings:Dict[str, Any] = None,
+            text:bool = False,
+            jobs:int = None,
+            profile:ExtractionProfile = None
+        ) -> 'PdfDocument':
+        """
+        Extract the tables, the words and/or the text of the pages that haven't been cached yet,
+        over a pool of processes. Each worker lays out a range of consecutive pages, and the
+        results are put back in the per page caches.
+
+        Nothing else changes: the pages are still read in order by get_tables, get_words,
+        iter_page_tables, ... so that what is done across pages (rows repeated on several pages,
+        labels continuing on the next page) works as with a sequential extraction.
+
+        Args:
+            - tables (bool): extract the tables of the pages.
+            - words_settings (Dict[str, Any]): if given, extract the words of the pages with these
+            keyword arguments of pdfplumber's extract_words.
+            - text (bool): extract the text of the pages.
+            - jobs (int): number of worker processes. Defaults to the number of cpus.
+            With jobs=1, the pages are extracted in the current process.
+            - profile (ExtractionProfile): region of the pages and table settings the tables
+            and the words are extracted with. Defaults to the whole page and pdfplumber's settings.
+
+        Returns:
+            The document itself.
+        """
+        was_open = self.is_open
+        bbox, table_settings = profile if profile is not None else ExtractionProfile()
+        pages = [
+            i for i in range(self.page_count)
+            if (tables and _tables_key(i, bbox, table_settings) not in self._tables)
+            or (words_settings is not None and _words_key(i, bbox, words_settings) not in self._words)
+            or (text and i not in self._texts)
+        ]
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = max(1, min(jobs, len(pages)))
+
+        if jobs == 1:
+            for i in pages:
+                if tables:
+                    self.get_page_tables(i, bbox=bbox, table_settings=table_settings)
+                if words_settings is not None:
+                    self.get_page_words(i, bbox=bbox, **words_settings)
+                if text:
+                    self.get_page_text(i)
+            if not was_open:
+                self.close()
+            return self
+
+        if not was_open:
+            self.close()
+
+        # Pages left to extract aren't always consecutive, ranges are cut over the missing pages.
+        size = -(-len(pages) // jobs)
+        ranges = [pages[start:start + size] for start in range(0, len(pages), size)]
+        stats = get_stats()
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(
+                    _extract_pages, self.file_path, page_range, tables, words_settings, text, stats is not None, bbox, table_settings
+                ) for page_range in ranges
+            ]
+            for future in futures:
+                page_tables, page_words, page_texts, worker_stats = future.result()
+                self._texts.update(page_texts)
+                for i, page in page_tables.items():
+                    self._tables[_tables_key(i, bbox, table_settings)] = page
+                for i, words in page_words.items():
+                    self._words[_words_key(i, bbox, words_settings)] = words
+                if worker_stats is not None:
+                    stats.merge(worker_stats)
+
+        return self
+
+    def get_text(self) -> str:
+        return "".join(self.get_page_text(i) for i in range(self.page_count))
+
+    def get_words(self, bbox:tuple[float, float, float, float] = None, **settings) -> List[Dict[str, Any]]:
+        words = []
+        for i in range(self.page_count):
+            words += self.get_page_words(i, bbox=bbox, **settings)
+        return words
+
+    def get_tables(self, bbox:tuple[float, float, float, float] = None, table_settings:Dict[str, Any] = None) -> List[List[List[str]]]:
+        tables = []
+        for i in range(self.page_count):
+            tables += self.get_page_tables(i, bbox=bbox, table_settings=table_settings)
+        return tables
+
+    def _iter_pages(self, cache:Dict, key, extract, stage_name:str) -> Iterator[Any]:
+        """
+        Yield the result of extract for each page, reusing the cached results.
+        Results that weren't cached are not stored, and the layout objects of each page
+        are released once it has been processed, so that memory doesn't grow with the
+        number of pages.
+        """
+        was_open = self.is_open
+        try:
+            for i in range(self.page_count):
+                if key(i) in cache:
+                    yield cache[key(i)]
+                    continue
+                with stage(stage_name, pages=1):
+                    page = self.pdf.pages[i]
+                    result = extract(page)
+                    page.close()
+                yield result
+        finally:
+            if not was_open:
+                self.close()
+
+    def iter_page_words(self, bbox:tuple[float, float, float, float] = None, **settings) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Args:
+            - bbox (tuple): optional region of the pages, see get_page_words.
+            - settings: keyword arguments given to pdfplumber's extract_words.
+
+        Returns:
+            An iterator over the words of each page.
+        """
+        return self._iter_pages(
+            self._words,
+            lambda i: _words_key(i, bbox, settings),
+            lambda page: _crop(page, bbox).extract_words(**settings),
+            'extract_words'
+        )
+
+    def iter_page_tables(self, bbox:tuple[float, float, float, float] = None, table_settings:Dict[str, Any] = None) -> Iterator[List[List[List[str]]]]:
+        """
+        Args:
+            - bbox (tuple), table_settings (Dict[str, Any]): optional region of the pages and
+            settings, see get_page_tables.
+
+        Returns:
+            An iterator over the tables of each page.
+        """
+        return self._iter_pages(
+            self._tables,
+            lambda i: _tables_key(i, bbox, table_settings),
+            lambda page: _crop(page, bbox).extract_tables(table_settings),
+            'extract_tables'
+        )
+
+def _extract_pages(
+        file_path:str,
+        pages:List[int],
+        tables:bool,
+        words_settings:Dict[str, Any] | None,
+        text:bool,
+        collect_stats:bool,
+        bbox:tuple | None = None,
+        table_settings:Dict[str, Any] | None = None
+    ) -> Tuple[Dict[int, List], Dict[int, List], Dict[int, str], Dict | None]:
+    """
+    Worker of PdfDocument.prefetch: extract the tables, words and/or text of some pages of a file.
+    The layout objects of each page are released once it has been processed.
+    """
+    def extract():
+        page_tables, page_words, page_texts = {}, {}, {}
+        with PdfDocument(file_path) as document:
+            for i in pages:
+                if tables:
+                    page_tables[i] = document.get_page_tables(i, bbox=bbox, table_settings=table_settings)
+                if words_settings is not None:
+                    page_words[i] = document.get_page_words(i, bbox=bbox, **words_settings)
+                if text:
+                    page_texts[i] = document.get_page_text(i)
+                document.pdf.pages[i].close()
+        return page_tables, page_words, page_texts
+
+    if not collect_stats:
+        return extract() + (None,)
+    with collect() as stats:
+        output = extract()
+    return output + (stats.to_dict(),)
@@ -1,4 +1,12 @@
 from abc import ABC, abstractmethod
+from bankparse.utils import find_subclass
+from bankparse.instrumentation import instrumented
+from bankparse.ndjson import write_records
+from bankparse.table_manager.normalization import normalize_date, normalize_dates, parse_dates, parse_amounts
+from bankparse.table_manager.row_store import RowStore
+from itertools import chain, compress
+from typing import Callable, Iterable, Iterator
+import numpy as np
 import pandas as pd
 
 class Table(ABC):
@@ -12,17 +20,40 @@ class Table(ABC):
     - accountId (str): Account's id from which the table comes from.
     - owner (str): Account's owner.
     - extraction_date (str): File's extraction date.
-    - content (list[list[str]]): Table's content.
+    - rows (RowStore): Table's content, stored column-wise.
+    - content (tuple[tuple[str]]): Table's content as rows, headers first. Built from rows on each
+    access, and read-only: item assignment or append raise a TypeError instead of silently
+    leaving the table unchanged. Assign a new list of rows to change the table.
+
+    Class attributes:
+    - LABEL_COLUMN (int): position of the label within the rows, for the tables whose labels
+    can be split over several rows (see is_continuation_row).
+    - INTERNED_COLUMNS (tuple[int]): positions of the columns with many repeated values (e.g. dates),
+    stored once per distinct value.
 
     Methods:
+    - iter_rows: iterate over the rows of the table, headers excluded.
+    - iter_records: iterate over the rows of the table as dicts, with the bank, owner,
+    extraction date and account of the table.
+    - to_ndjson: write the records of the table to newline-delimited JSON.
+    - is_continuation_row: tell if a row is the continuation of the previous row's label.
+    - merge_rows: merge the continuation rows into the previous rows.
+    - filter_rows: drop rows matching a predicate.
+    - mergeTransactionLabel: merge the split labels of the table's content.
     - get_dict: return table's content as a dict
     - get_dataframe: return table's content as a pandas DataFrame.
+    - to_arrow: return table's content as a pyarrow Table.
+    - serialize: return the table as a dict of builtin types.
+    - deserialize: rebuild a table from the output of serialize.
 
     Comments:
     - Different kind of tables wouldn't be available depending of the files that the dev 
     have at hand. Therefore, it may happen that some subclasses and/or methods are
     unavailable at this moment.
     """
+    LABEL_COLUMN = None
+    INTERNED_COLUMNS = ()
+
     def __init__(self):
         self.sourceBankLabel = None
         self.accountId = None
@@ -30,17 +61,65 @@ class Table(ABC):
         self.extraction_date = None
         self.content = None
 
+    @property
+    def content(self) -> tuple[tuple[str, ...], ...] | None:
+        if self.rows is None:
+            return None
+        return (tuple(self.rows.headers), *self.rows.iter_rows())
+
+    @content.setter
+    def content(self, value:list[list[str]] | None):
+        try:
+            self.rows = RowStore.from_rows(value, intern_columns=self.INTERNED_COLUMNS) if value is not None else None
+        except ValueError as e:
+            raise ValueError(f"{type(self).__name__} of account {self.accountId}: {e}") from e
+
+    def iter_rows(self) -> Iterator[tuple[str, ...]]:
+        """
+        Iterate over the rows of the table, headers excluded, as tuples.
+        """
+        return self.rows.iter_rows()
+
+    def iter_records(self) -> Iterator[dict[str, str]]:
+        """
+        Iterate over the rows of the table, headers excluded, as dicts: source_bank, owner,
+        extraction_date and accountId, followed by the columns of the table.
+        """
+        headers = [key if key else f"column_{i}" for i, key in enumerate(self.rows.headers)]
+        for line in self.rows.iter_rows():
+            record = {
+                'source_bank':self.sourceBankLabel,
+                'owner':self.owner,
+                'extraction_date':self.extraction_date,
+                'accountId':str(self.accountId)
+            }
+            record.update(zip(headers, line))
+            yield record
+
+    @instrumented('table.to_ndjson', rows=lambda table, result: result)
+    def to_ndjson(self, output) -> int:
+        """
+        Write the records of the table (see iter_records) to newline-delimited JSON, one record
+        per line, without building the whole output in memory. Uses orjson if it is installed.
+
+        Args:
+            - output (str | PathLike | stream): path of the file or writable stream, see
+            bankparse.ndjson.write_records.
+
+        Returns:
+            The number of records written.
+        """
+        return write_records(self.iter_records(), output)
+
     @abstractmethod
     def get_dict(self):
         """
         Method returning table's content as a python dict.
+        The columns are read from the row store, without transposing the rows.
         """
         output = {}
-        keys = self.content[0]
-        values = self.content[1:]
-
-        for i, key in enumerate(keys):
-            output[key] = [val[i] for val in values]
+        for key, column in zip(self.rows.headers, self.rows.columns):
+            output[key] = list(column)
 
         return output
     
@@ -54,15 +133,113 @@ class Table(ABC):
         )
 
         return output
-    
-    def mergeTransactionLabel(self, inplace:bool=False):
+
+    @instrumented('table.to_arrow', rows=lambda table, result: result.num_rows)
+    def to_arrow(self):
+        """
+        Method returning table's content as a pyarrow Table, without going through pandas.
+        The columns are source_bank, owner, extraction_date and accountId, followed by
+        the columns of the table as strings.
+
+        pyarrow is an optional dependency, see bankparse[arrow].
+        """
+        from bankparse.arrow import import_pyarrow, date_array
+        pa = import_pyarrow()
+
+        n_rows = len(self.rows)
+        columns = self.rows.columns
+        names = [key if key else f"column_{i}" for i, key in enumerate(self.rows.headers)]
+
+        return pa.Table.from_arrays(
+            [
+                pa.array([self.sourceBankLabel] * n_rows, pa.string()),
+                pa.array([self.owner] * n_rows, pa.string()),
+                date_array([self.extraction_date] * n_rows),
+                pa.array([str(self.accountId)] * n_rows, pa.string())
+            ] + [pa.array(column, pa.string()) for column in columns],
+            names=['source_bank', 'owner', 'extraction_date', 'accountId'] + names
+        )
+
+    def serialize(self) -> dict:
+        """
+        Method returning the table as a dict of builtin types, that can be pickled
+        or dumped to JSON without any reference to the pdf file.
+        """
+        return {
+            'table_class':type(self).__name__,
+            'accountId':self.accountId,
+            'owner':self.owner,
+            'extraction_date':self.extraction_date,
+            'content':self.rows.to_rows() if self.rows is not None else None
+        }
+
+    @staticmethod
+    def deserialize(data:dict) -> 'Table':
+        """
+        Rebuild a table from the output of serialize.
+
+        Args:
+            - data (dict): serialized table.
+
+        Returns:
+            An instance of the concrete table class named in data.
+        """
+        data = dict(data)
+        table_class = find_subclass(Table, data.pop('table_class'))
+        return table_class(**data)
+
+    @classmethod
+    def is_continuation_row(cls, line:list[str]) -> bool:
+        """
+        Tell if a row is the continuation of the previous row's label.
+        Overridden by the tables whose labels can be split over several rows.
+        """
+        return False
+
+    @classmethod
+    def merge_rows(cls, rows:Iterable[list[str]]) -> list[list[str]]:
+        """
+        Merge the continuation rows (see is_continuation_row) into the label of the row before, in a single pass.
+        The merged rows are copies: the given rows aren't modified.
+
+        Args:
+            - rows (Iterable[list[str]]): rows of the table, headers included.
+
+        Returns:
+            - list[list[str]]: a new list of rows, without the continuation rows.
+        """
+        label = cls.LABEL_COLUMN
+        output = []
+        for line in rows:
+            if output and cls.is_continuation_row(line):
+                output[-1][label] += ' ' + line[label]
+            else:
+                output.append(list(line))
+        return output
+
+    @staticmethod
+    def filter_rows(rows:Iterable[list[str]], drop:Callable[[list[str]], bool]) -> list[list[str]]:
+        """
+        Return a new list of the rows for which drop is False, in a single pass.
+        """
+        return [line for line in rows if not drop(line)]
+
+    @instrumented('table.merge_labels', rows=lambda table, result: len(table.rows))
+    def mergeTransactionLabel(self, inplace:bool=False) -> list[list[str]] | None:
         """
         Some label are too long to fit in a unique cell within the pdf.
-        This function merge the split label into one unique.
+        This function merge the split label into one unique, see merge_rows.
         
         The merging should be done automatically when the transaction table is instanciated.
+
+        Returns:
+            - None if inplace is True. The content of the table is replaced by the merged content.
+            - The merged content if inplace is False. The content of the table is left untouched.
         """
-        pass
+        output = self.merge_rows(chain([self.rows.headers], self.rows.iter_rows()))
+        if inplace==False:
+            return output
+        self.content = output
 
     def getBalanceStatements(self):
         """
@@ -82,8 +259,219 @@ class Table(ABC):
         pass
 
 class BankTransactionTable(Table):
+    """
+    Class for transaction tables within the extraction files.
+
+    Class attributes:
+    - OPERATION_DATE_COLUMN, VALUE_DATE_COLUMN, LABEL_COLUMN, DEBIT_COLUMN, CREDIT_COLUMN (int):
+    position of each column within the rows of the table.
+
+    Methods:
+    - is_continuation_row: tell if a row is the continuation of the previous row's label.
+    - is_balance_row: tell if a row is a balance statement.
+    - is_transaction_row: tell if a row is a transaction.
+    - dropBalanceStatements: remove the balance statements from the table's content.
+    - build_transaction: turn a row into a normalized transaction.
+    - iter_transactions: iterate over the normalized transactions of the table.
+    - iter_records: same as iter_transactions, so that to_ndjson writes the transactions.
+    - normalize_amount_column: convert a column of amounts to strings using '.' as decimal separator.
+    - parse_date_column: convert a column of dates to datetime64.
+    - parse_amount_column: convert a column of amounts to float64.
+    - get_dataframe: return table's content as a pandas DataFrame, typed if asked.
+    - to_arrow: return the transactions of the table as a pyarrow Table.
+    """
+    OPERATION_DATE_COLUMN = 0
+    VALUE_DATE_COLUMN = 1
+    LABEL_COLUMN = 2
+    DEBIT_COLUMN = -2
+    CREDIT_COLUMN = -1
+    INTERNED_COLUMNS = (OPERATION_DATE_COLUMN, VALUE_DATE_COLUMN)
+
     def __init__(self):
         super().__init__()
+        self._statement_lines_indexes = []
+
+    @classmethod
+    def is_balance_row(cls, line:list[str]) -> bool:
+        return False
+
+    @staticmethod
+    def normalize_date(date:str, extraction_date:str) -> str:
+        """
+        Convert a date of the table to yyyy-mm-dd format.
+        """
+        return normalize_date(date, extraction_date)
+
+    @staticmethod
+    def normalize_amount(amount:str) -> str:
+        """
+        Convert an amount of the table to a string using '.' as decimal separator.
+        """
+        return amount
+
+    @classmethod
+    def build_transaction(cls, line:list[str], source_bank:str, owner:str, extraction_date:str, accountId:str) -> dict[str, str]:
+        """
+        Turn a row of the table into a normalized transaction.
+
+        Returns:
+            - dict[str, str]
+            keys: (source_bank, owner, extraction_date, accountId,
+            operation_date, value_date, label, debit, credit.)
+        """
+        return {
+            'source_bank':source_bank,
+            'owner':owner,
+            'extraction_date':extraction_date,
+            'accountId':str(accountId),
+            'operation_date':cls.normalize_date(line[cls.OPERATION_DATE_COLUMN], extraction_date),
+            'value_date':cls.normalize_date(line[cls.VALUE_DATE_COLUMN], extraction_date),
+            'label':line[cls.LABEL_COLUMN],
+            'debit':cls.normalize_amount(line[cls.DEBIT_COLUMN]),
+            'credit':cls.normalize_amount(line[cls.CREDIT_COLUMN])
+        }
+
+    @classmethod
+    def is_transaction_row(cls, line:list[str]) -> bool:
+        """
+        Tell if a row of the table is a transaction: it has an operation date
+        and isn't a balance statement.
+        """
+        return bool(line[cls.OPERATION_DATE_COLUMN]) and not cls.is_balance_row(line)
+
+    def iter_transactions(self) -> Iterator[dict[str, str]]:
+        """
+        Iterate over the transactions of the table, skipping the headers and
+        the balance statements.
+
+        Returns:
+            An iterator over the normalized transactions, see build_transaction.
+        """
+        for line in self.rows.iter_rows():
+            if self.is_transaction_row(line):
+                yield self.build_transaction(line, self.sourceBankLabel, self.owner, self.extraction_date, self.accountId)
+
+    def iter_records(self) -> Iterator[dict[str, str]]:
+        return self.iter_transactions()
+
+    def dropBalanceStatements(self, inplace:str=True) -> list[list[str]] | None:
+        """
+        Remove the balance statements (see is_balance_row) from the table's content, in a single pass.
+
+        Returns:
+            - None if inplace is True. The content of the table is replaced, and the balance
+            statements can't be retrieved anymore.
+            - The content without the balance statements if inplace is False.
+        """
+        if self._statement_lines_indexes == -1:
+            print('Statements lines have already been dropped.')
+            return None
+
+        if inplace==True:
+            self._statement_lines_indexes = -1
+            self.rows = self.rows.compress(not self.is_balance_row(line) for line in self.rows.iter_rows())
+            return None
+        return self.filter_rows(self.rows.to_rows(), self.is_balance_row)
+
+    @classmethod
+    def parse_date_column(cls, dates:pd.Series, extraction_date:str) -> pd.Series:
+        """
+        Convert a column of dates of the table to datetime64. Invalid dates become NaT.
+        """
+        return parse_dates(dates, extraction_date)
+
+    @classmethod
+    def normalize_amount_column(cls, amounts:Iterable[str]) -> pd.Series:
+        """
+        Column-wise version of normalize_amount.
+        """
+        return pd.Series(amounts, dtype=object)
+
+    @classmethod
+    def parse_amount_column(cls, amounts:pd.Series) -> pd.Series:
+        """
+        Convert a column of amounts of the table to float64. Empty amounts become NaN.
+        """
+        return parse_amounts(cls.normalize_amount_column(amounts))
+
+    def _transaction_columns(self) -> tuple[int, list[tuple[str]]]:
+        """
+        Return the number of transactions of the table and its columns, restricted to the transactions.
+        """
+        selectors = [self.is_transaction_row(line) for line in self.rows.iter_rows()]
+        if all(selectors):
+            return len(selectors), self.rows.columns
+        return sum(selectors), [list(compress(column, selectors)) for column in self.rows.columns]
+
+    @instrumented('table.get_dataframe', rows=lambda table, result: len(result))
+    def get_dataframe(self, typed:bool=False) -> pd.DataFrame:
+        """
+        Method returning table's content as a pandas DataFrame.
+
+        Args:
+            - typed (bool): if False, the content of the table as strings, see get_dict.
+            If True, only the transactions, with the columns:
+                - source_bank, owner, accountId (category)
+                - extraction_date, operation_date, value_date (datetime64)
+                - label (str)
+                - amount (float64): credit - debit.
+
+        Comments:
+        - The typed DataFrame is built column-wise, without normalizing each cell in python.
+        """
+        if not typed:
+            return super().get_dataframe()
+
+        n_rows, columns = self._transaction_columns()
+
+        def column(index:int) -> pd.Series:
+            return pd.Series(columns[index], dtype=object)
+
+        def constant(value) -> pd.Categorical:
+            return pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), categories=[str(value)])
+
+        debit = self.parse_amount_column(column(self.DEBIT_COLUMN))
+        credit = self.parse_amount_column(column(self.CREDIT_COLUMN))
+
+        return pd.DataFrame({
+            'source_bank':constant(self.sourceBankLabel),
+            'owner':constant(self.owner),
+            'extraction_date':pd.to_datetime(pd.Series([self.extraction_date] * n_rows, dtype=object), format='%Y-%m-%d'),
+            'accountId':constant(self.accountId),
+            'operation_date':self.parse_date_column(column(self.OPERATION_DATE_COLUMN), self.extraction_date),
+            'value_date':self.parse_date_column(column(self.VALUE_DATE_COLUMN), self.extraction_date),
+            'label':column(self.LABEL_COLUMN),
+            'amount':credit.fillna(0.0) - debit.fillna(0.0)
+        })
+
+    @instrumented('table.to_arrow', rows=lambda table, result: result.num_rows)
+    def to_arrow(self):
+        """
+        Method returning the transactions of the table as a pyarrow Table.
+        The schema is the same for every bank, see bankparse.arrow.transaction_schema:
+        dates are date32 and debit/credit are float64, null when empty.
+
+        pyarrow is an optional dependency, see bankparse[arrow].
+        """
+        from bankparse.arrow import import_pyarrow, transaction_schema, date_array, amount_array
+        pa = import_pyarrow()
+
+        n_rows, columns = self._transaction_columns()
+
+        return pa.Table.from_arrays(
+            [
+                pa.array([self.sourceBankLabel] * n_rows, pa.string()),
+                pa.array([self.owner] * n_rows, pa.string()),
+                date_array([self.extraction_date] * n_rows),
+                pa.array([str(self.accountId)] * n_rows, pa.string()),
+                date_array(normalize_dates(columns[self.OPERATION_DATE_COLUMN], self.extraction_date)),
+                date_array(normalize_dates(columns[self.VALUE_DATE_COLUMN], self.extraction_date)),
+                pa.array(columns[self.LABEL_COLUMN], pa.string()),
+                amount_array(self.normalize_amount_column(columns[self.DEBIT_COLUMN])),
+                amount_array(self.normalize_amount_column(columns[self.CREDIT_COLUMN]))
+            ],
+            schema=transaction_schema()
+        )
 
 class BalanceStatementTable(Table):
     def __init__(self):
@@ -1,9 +1,14 @@
 from bankparse.table_manager.base_table import BankTransactionTable
-from bankparse.table_manager.utils import ddmmyyyy_date_to_yyyymmdd
-import pdfplumber
+from bankparse.table_manager.normalization import normalize_amount, normalize_dates
+from bankparse.pdf_document import PdfDocument, DEFAULT_WORDS_SETTINGS
+from bankparse.instrumentation import instrumented
 
 class BoursoBankTransactionTable(BankTransactionTable):
-    def __init__(self, content: list[str], owner: str, extraction_date: str, accountId: str, file_path:str):
+    VALUE_DATE_COLUMN = 2
+    LABEL_COLUMN = 1
+    INTERNED_COLUMNS = (0, VALUE_DATE_COLUMN)
+
+    def __init__(self, content: list[str], owner: str, extraction_date: str, accountId: str, file_path:str = None, document:PdfDocument = None, balances:dict = None):
         assert type(content) == list
         super().__init__()
         self.accountId = accountId
@@ -12,50 +17,34 @@ class BoursoBankTransactionTable(BankTransactionTable):
         self.owner = owner
         self.extraction_date = extraction_date
         self.file_path = file_path
+        self.document = document
+        self.balances = balances
 
     def getBalanceStatements(self):
         """
-        Method to retrieve balance statements directly from the file.
+        Method to retrieve balance statements of the file.
+        The balances are read along with the transactions, see BoursoWordStreamParser,
+        so that no file access is needed. The file is only read if the table was built
+        without them.
 
         Returns:
             - list[dict[str, str]]
             keys: (source_bank, owner, extraction_date, 
             accountId, statement_date, balance.)
         """
-        with pdfplumber.open(self.file_path) as pdf:
-            words = []
-            for i, page in enumerate(pdf.pages):
-                words_in_page = page.extract_words(
-                    use_text_flow=False,
-                    keep_blank_chars=True,
-                    x_tolerance=1
-                )
-
-                words += words_in_page
+        if self.balances is None:
+            from bankparse.file_manager.bourso_statement_file import BoursoWordStreamParser
+            document = self.document if self.document is not None else PdfDocument(self.file_path)
+            parser = BoursoWordStreamParser()
+            for words in document.iter_page_words(**DEFAULT_WORDS_SETTINGS):
+                parser.feed_page(words)
+            self.balances = parser.balances
 
-        first_statement_found = False
-        last_statement_found = False
-        for i, word in enumerate(words):
-            if not first_statement_found:
-                if "SOLDE" in word['text']:
-                    if words[i+4]['x0'] < 500:
-                        first_statement_amount = '-' + words[i+4]['text']
-                    else:
-                        first_statement_amount = words[i+4]['text']
-                    first_statement_date = words[i+3]['text']
-                    first_statement_found = True
-            if not last_statement_found:
-                if "Nouveau" in word['text']:
-                    if words[i+5]['x0'] < 500:
-                        last_statement_amount = '-' + words[i+5]['text']
-                    else:
-                        last_statement_amount = words[i+5]['text']
-                    last_statement_found = True
-        
-        output = {
-            'first':[first_statement_amount, first_statement_date],
-            'second':[last_statement_amount, self.extraction_date]
-        }
+        output = {}
+        if 'opening' in self.balances:
+            output['first'] = self.balances['opening']
+        if 'closing' in self.balances:
+            output['second'] = [self.balances['closing'][0], self.extraction_date]
 
         return [
             {
@@ -64,17 +53,24 @@ class BoursoBankTransactionTable(BankTransactionTable):
                 'extraction_date':self.extraction_date,
                 'accountId':self.accountId,
                 'statement_date':value[1],
-                'balance':value[0].replace('.', '').replace(',', '.')
+                'balance':normalize_amount(value[0])
             } for value in output.values()
         ]
 
+    def serialize(self) -> dict:
+        output = super().serialize()
+        output['file_path'] = self.file_path
+        output['balances'] = self.balances
+        return output
+
+    @instrumented('table.get_dict', rows=lambda table, result: len(table.rows))
     def get_dict(self):
         stage_output = super().get_dict()
         key1, key2 = list(stage_output.keys())[0], list(stage_output.keys())[2]
-        stage_output[key1] = list(map(ddmmyyyy_date_to_yyyymmdd, stage_output[key1]))
-        stage_output[key2] = list(map(ddmmyyyy_date_to_yyyymmdd, stage_output[key2]))
+        stage_output[key1] = normalize_dates(stage_output[key1]).tolist()
+        stage_output[key2] = normalize_dates(stage_output[key2]).tolist()
 
         return stage_output
 
-    def get_dataframe(self):
-        return super().get_dataframe()
\ No newline at end of file
+    def get_dataframe(self, typed:bool=False):
+        return super().get_dataframe(typed=typed)
\ No newline at end of file
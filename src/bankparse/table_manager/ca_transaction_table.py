@@ -1,6 +1,10 @@
 from bankparse.table_manager.base_table import BankTransactionTable
+from bankparse.table_manager.normalization import normalize_amount, normalize_amounts, normalize_date, normalize_dates, parse_amount
 from bankparse.utils import matches
-import re
+from bankparse.instrumentation import instrumented
+from typing import Iterable
+import pandas as pd
+import re, warnings
 
 class CABankTransactionTable(BankTransactionTable):
     def __init__(self, content: list[str], owner: str, extraction_date: str, accountId: str):
@@ -15,6 +19,20 @@ class CABankTransactionTable(BankTransactionTable):
 
         self.mergeTransactionLabel(inplace=True)
     
+    @classmethod
+    def is_continuation_row(cls, line:list[str]) -> bool:
+        return (line[-1] == '') and (line[-2] == '')
+
+    @classmethod
+    def is_balance_row(cls, line:list[str]) -> bool:
+        return matches(r"(?i)solde\s+cr[ée]diteur\s+au\s+(\d{2}\.\d{2}\.\d{4})", line[2])
+
+    normalize_amount = staticmethod(normalize_amount)
+
+    @classmethod
+    def normalize_amount_column(cls, amounts:Iterable[str]) -> pd.Series:
+        return normalize_amounts(amounts)
+
     @property
     def statement_lines_indexes(self):
         """
@@ -26,29 +44,14 @@ class CABankTransactionTable(BankTransactionTable):
     def statement_lines_indexes(self, value):
         print("You can't set this value.")
 
-    def mergeTransactionLabel(self, inplace:bool=False):
-        line_to_del = []
-        output = self.content.copy()
-        for i, line in enumerate(output):
-            if (line[-1] == '') and (line[-2] == ''):
-                output[i-1][2] += ' ' + line[2]
-                line_to_del.insert(0, i)
-        
-        for i in line_to_del:
-            del output[i]
-        
-        if inplace==False:
-            return output
-        self.content = output
-
     def getBalanceStatements(self):
         if self._statement_lines_indexes == -1:
             print('Balance statements have been dropped.')
             return None
         
         stage_output = []
-        for i, line in enumerate(self.content):
-            if matches(r"(?i)solde\s+cr[ée]diteur\s+au\s+(\d{2}\.\d{2}\.\d{4})", line[2]):
+        for i, line in enumerate(self.rows.iter_rows(), start=1):
+            if self.is_balance_row(line):
                 stage_output.insert(-1, line)
                 self._statement_lines_indexes.append(i)
             else:
@@ -62,62 +65,43 @@ class CABankTransactionTable(BankTransactionTable):
                 "accountId": str(self.accountId),
                 "statement_date": re.search(r"\d{2}\.\d{2}\.\d{4}", state[2]).group().replace('.', '/'),
                 "balance": (
-                        float(state[-1].replace('.', '').replace(',', '.').replace(" ", ""))
+                        parse_amount(state[-1])
                         if state[-1] != ""
-                        else -float(state[-2].replace('.', '').replace(',', '.').replace(" ", ""))
+                        else -parse_amount(state[-2])
                 )
             }
             for state in stage_output
         ]
     
-    def dropBalanceStatements(self, inplace:str=True) -> list[list[str]] | None:
-        if self._statement_lines_indexes == -1:
-            print('Statements lines have already been dropped.')
-            return None
-
-        if self._statement_lines_indexes == []:
-            for i, line in enumerate(self.content):
-                if matches(r"\b\d{2}/\d{2}/\d{4}\b", line[0]) and 'solde' in line[0].lower():
-                    self._statement_lines_indexes.append(i)
-
-        temp_table = self.content.copy()
-        self._statement_lines_indexes.sort(reverse=True)
-        for index in self._statement_lines_indexes:
-            del temp_table[index]
-
-        if inplace==True:
-            self._statement_lines_indexes = -1
-            self.content = temp_table
-            return None
-        else:
-            print(temp_table)
-
+    @instrumented('table.get_dict', rows=lambda table, result: len(table.rows))
     def str_month_to_int(self, ddmm_date):
-        month = ddmm_date.split('.')[-1].lstrip("0")
-        
-        return int(month)
-    
-    def ddmm_date_to_yyyymmdd(self, ddmm_date):
-        if self.str_month_to_int(ddmm_date=ddmm_date) < 12:
-            year = self.extraction_date.split('-')[0]
-        else:
-            year = str(int(self.extraction_date.split('-')[0]) - 1)
-
-        dd, mm = ddmm_date.split('.')
+        """
+        Deprecated: the dates are converted by normalize_date.
+        """
+        warnings.warn("str_month_to_int is deprecated", DeprecationWarning, stacklevel=2)
+        return int(ddmm_date.split('.')[-1])
 
-        return "-".join((year, mm, dd))
+    def ddmm_date_to_yyyymmdd(self, ddmm_date):
+        """
+        Deprecated: use bankparse.table_manager.normalization.normalize_date.
+        """
+        warnings.warn(
+            "ddmm_date_to_yyyymmdd is deprecated, use bankparse.table_manager.normalization.normalize_date",
+            DeprecationWarning, stacklevel=2
+        )
+        return normalize_date(ddmm_date, self.extraction_date)
 
     def get_dict(self):
         stage_output = super().get_dict()
         key1, key2 = list(stage_output.keys())[:2]
-        stage_output[key1] = list(map(self.ddmm_date_to_yyyymmdd, stage_output[key1]))
-        stage_output[key2] = list(map(self.ddmm_date_to_yyyymmdd, stage_output[key2]))
+        stage_output[key1] = normalize_dates(stage_output[key1], self.extraction_date).tolist()
+        stage_output[key2] = normalize_dates(stage_output[key2], self.extraction_date).tolist()
 
         key1, key2 = list(stage_output.keys())[-2:]
-        stage_output[key1] = list(map(lambda x: x.replace(' ', '').replace(',', '.'), stage_output[key1]))
-        stage_output[key2] = list(map(lambda x: x.replace(' ', '').replace(',', '.'), stage_output[key2]))
+        stage_output[key1] = normalize_amounts(stage_output[key1]).tolist()
+        stage_output[key2] = normalize_amounts(stage_output[key2]).tolist()
 
         return stage_output
 
-    def get_dataframe(self):
-        return super().get_dataframe()
\ No newline at end of file
+    def get_dataframe(self, typed:bool=False):
+        return super().get_dataframe(typed=typed)
\ No newline at end of file
@@ -1,6 +1,9 @@
 from bankparse.table_manager import BankTransactionTable
 from bankparse.utils import matches
-from bankparse.table_manager.utils import ddmmyyyy_date_to_yyyymmdd
+from bankparse.instrumentation import instrumented
+from bankparse.table_manager.normalization import normalize_amount, normalize_amounts, normalize_dates, parse_amount
+from typing import Iterable
+import pandas as pd
 import re
 
 class CMBankTransactionTable(BankTransactionTable):
@@ -16,6 +19,20 @@ class CMBankTransactionTable(BankTransactionTable):
 
         self.mergeTransactionLabel(inplace=True)
     
+    @classmethod
+    def is_continuation_row(cls, line:list[str]) -> bool:
+        return line[0] == ''
+
+    @classmethod
+    def is_balance_row(cls, line:list[str]) -> bool:
+        return matches(r"\b\d{2}/\d{2}/\d{4}\b", line[0]) and 'solde' in line[0].lower()
+
+    normalize_amount = staticmethod(normalize_amount)
+
+    @classmethod
+    def normalize_amount_column(cls, amounts:Iterable[str]) -> pd.Series:
+        return normalize_amounts(amounts)
+
     @property
     def statement_lines_indexes(self):
         """
@@ -27,37 +44,14 @@ class CMBankTransactionTable(BankTransactionTable):
     def statement_lines_indexes(self, value):
         print("You can't set this value.")
 
-    def mergeTransactionLabel(self, inplace:bool=False) -> list[list[list[str]]] | None:
-        """
-        Some label are too long to fit in a unique cell within the pdf.
-        This function merge the split label into one unique.
-
-        Returns:
-            - None if inplace is True. The content of the table will be merged inplace.
-            - The merged content if inplace is False. 
-        """
-        line_to_del = []
-        output = self.content.copy()
-        for i, line in enumerate(output):
-            if line[0] == '':
-                output[i-1][2] += ' ' + line[2]
-                line_to_del.insert(0, i)
-        
-        for i in line_to_del:
-            del output[i]
-        
-        if inplace==False:
-            return self.content
-        self.content = output
-
     def getBalanceStatements(self):
         if self._statement_lines_indexes == -1:
             print('Balance statements have been dropped.')
             return None
         
         stage_output = []
-        for i, line in enumerate(self.content):
-            if matches(r"\b\d{2}/\d{2}/\d{4}\b", line[0]) and 'solde' in line[0].lower():
+        for i, line in enumerate(self.rows.iter_rows(), start=1):
+            if self.is_balance_row(line):
                 stage_output.insert(-1, line)
                 self._statement_lines_indexes.append(i)
             else:
@@ -74,48 +68,26 @@ class CMBankTransactionTable(BankTransactionTable):
                     0.0
                     if "NUL" in state[0]
                     else (
-                        float(state[-1].replace('.', '').replace(',', '.'))
+                        parse_amount(state[-1])
                         if state[-1] != ""
-                        else -float(state[-2].replace('.', '').replace(',', '.'))
+                        else -parse_amount(state[-2])
                     )
                 )
             }
             for state in stage_output
         ]
     
-    def dropBalanceStatements(self, inplace:str=True) -> list[list[str]] | None:
-        if self._statement_lines_indexes == -1:
-            print('Statements lines have already been dropped.')
-            return None
-
-        if self._statement_lines_indexes == []:
-            for i, line in enumerate(self.content):
-                if matches(r"\b\d{2}/\d{2}/\d{4}\b", line[0]) and 'solde' in line[0].lower():
-                    self._statement_lines_indexes.append(i)
-
-        temp_table = self.content.copy()
-        self._statement_lines_indexes.sort(reverse=True)
-        for index in self._statement_lines_indexes:
-            del temp_table[index]
-
-        if inplace==True:
-            self._statement_lines_indexes = -1
-            self.content = temp_table
-            return None
-        else:
-            print(temp_table)
-
     def get_dict(self):
         stage_output = super().get_dict()
         key1, key2 = list(stage_output.keys())[:2]
-        stage_output[key1] = list(map(ddmmyyyy_date_to_yyyymmdd, stage_output[key1]))
-        stage_output[key2] = list(map(ddmmyyyy_date_to_yyyymmdd, stage_output[key2]))
+        stage_output[key1] = normalize_dates(stage_output[key1]).tolist()
+        stage_output[key2] = normalize_dates(stage_output[key2]).tolist()
 
         key1, key2 = list(stage_output.keys())[-2:]
-        stage_output[key1] = list(map(lambda x: x.replace('.', '').replace(',', '.'), stage_output[key1]))
-        stage_output[key2] = list(map(lambda x: x.replace('.', '').replace(',', '.'), stage_output[key2]))
+        stage_output[key1] = normalize_amounts(stage_output[key1]).tolist()
+        stage_output[key2] = normalize_amounts(stage_output[key2]).tolist()
 
         return stage_output
     
-    def get_dataframe(self):
-        return super().get_dataframe()
\ No newline at end of file
+    def get_dataframe(self, typed:bool=False):
+        return super().get_dataframe(typed=typed)
\ No newline at end of file
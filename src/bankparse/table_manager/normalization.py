@@ -0,0 +1,119 @@
+from typing import Iterable
+import importlib.util
+import numpy as np
+import pandas as pd
+import re
+
+# Separators found in the amounts of french statements: '.', spaces and non-breaking
+# spaces group the thousands, ',' is the decimal separator.
+FRENCH_AMOUNT_TABLE = str.maketrans({'.':None, ' ':None, '\xa0':None, '\u202f':None, ',':'.'})
+THOUSANDS_SEPARATORS = '[. \xa0\u202f]'
+
+DATE_PATTERN = re.compile(r'(\d{2})[/.](\d{2})(?:[/.](\d{4}))?')
+LONG_DATE_PATTERN = r'^(\d{2})[/.](\d{2})[/.](\d{4})$'
+SHORT_DATE_PATTERN = r'\d{2}[/.]\d{2}'
+
+# String dtype of the columns. Backed by pyarrow when it is installed (bankparse[arrow]), the
+# .str methods then run over the whole column without looping in python, whatever the version
+# of pandas. Missing values are NaN either way, as with the default string dtype of pandas 3.
+STRING_DTYPE = pd.StringDtype(
+    'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'python',
+    na_value=np.nan
+)
+
+def normalize_amount(amount:str) -> str:
+    """
+    Convert an amount under french format (e.g. '1 234,56' or '1.234,56') to a string
+    using '.' as decimal separator (e.g. '1234.56'). An empty amount stays empty.
+    """
+    return amount.translate(FRENCH_AMOUNT_TABLE)
+
+def normalize_amounts(amounts:Iterable[str]) -> pd.Series:
+    """
+    Column-wise version of normalize_amount, with pandas string methods.
+    """
+    amounts = pd.Series(amounts, dtype=STRING_DTYPE)
+    return amounts.str.replace(THOUSANDS_SEPARATORS, '', regex=True).str.replace(',', '.', regex=False)
+
+def parse_amount(amount:str) -> float:
+    """
+    Convert an amount under french format to a float.
+    """
+    return float(amount.translate(FRENCH_AMOUNT_TABLE))
+
+def parse_amounts(amounts:Iterable[str]) -> pd.Series:
+    """
+    Convert a column of amounts using '.' as decimal separator to float64.
+    Empty or invalid amounts become NaN.
+    """
+    amounts = pd.Series(amounts, dtype=object)
+    return pd.to_numeric(amounts.replace('', np.nan), errors='coerce').astype('float64')
+
+def _years(extraction_date:str | None) -> tuple[str, str] | None:
+    """
+    Year of the dates without year of a file: the year of its extraction date, or the
+    year before for december, since statements are issued monthly.
+    """
+    if not extraction_date:
+        return None
+    year = int(extraction_date[:4])
+    return str(year), str(year - 1)
+
+def _normalize_date(date:str, years:tuple[str, str] | None) -> str:
+    match = DATE_PATTERN.fullmatch(date)
+    if match is None:
+        return date
+
+    dd, mm, yyyy = match.groups()
+    if yyyy is None:
+        if years is None:
+            return date
+        yyyy = years[0] if mm < '12' else years[1]
+    return f"{yyyy}-{mm}-{dd}"
+
+def normalize_date(date:str, extraction_date:str = None) -> str:
+    """
+    Convert a date under dd/mm/yyyy, dd.mm.yyyy, dd/mm or dd.mm format to yyyy-mm-dd.
+    The year of the dates without year is inferred from the extraction date of the file.
+    Values that aren't dates are returned unchanged.
+
+    Args:
+        - date (str)
+        - extraction_date (str): extraction date of the file, under yyyy-mm-dd format.
+    """
+    return _normalize_date(date, _years(extraction_date))
+
+def normalize_dates(dates:Iterable[str], extraction_date:str = None) -> pd.Series:
+    """
+    Column-wise version of normalize_date, with pandas string methods.
+    The year is inferred once for the whole column.
+    """
+    dates = pd.Series(dates, dtype=STRING_DTYPE)
+    output = dates.str.replace(LONG_DATE_PATTERN, r'\3-\2-\1', regex=True)
+
+    years = _years(extraction_date)
+    if years is None:
+        return output
+    short = dates.str.fullmatch(SHORT_DATE_PATTERN)
+    if not short.any():
+        return output
+    month = dates.str.slice(3, 5)
+    year = pd.Series(np.where(month < '12', years[0], years[1]), index=dates.index, dtype=STRING_DTYPE)
+    return output.mask(short, year + '-' + month + '-' + dates.str.slice(0, 2))
+
+def parse_dates(dates:Iterable[str], extraction_date:str = None) -> pd.Series:
+    """
+    Convert a column of dates, see normalize_date, to datetime64.
+    Empty or invalid dates become NaT.
+
+    Comments:
+    - dd/mm/yyyy dates are parsed by pd.to_datetime directly, the other formats are only
+    normalized for the dates it couldn't parse.
+    """
+    dates = pd.Series(dates, dtype=STRING_DTYPE)
+    parsed = pd.to_datetime(dates, format='%d/%m/%Y', errors='coerce')
+    others = parsed.isna()
+    if others.any():
+        normalized = normalize_dates(dates[others], extraction_date)
+        parsed = pd.to_datetime(normalized, format='%Y-%m-%d', errors='coerce').combine_first(parsed)
+    return parsed
@@ -0,0 +1,77 @@
+from itertools import compress
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+import sys
+
+class RowStore():
+    """
+    Column-wise storage of the rows of a table.
+
+    A table is kept as one tuple of values per column instead of one list per row, which
+    saves the per row list objects and lets the columns be read without transposing the rows.
+    The values of the columns given as intern_columns (e.g. dates) are interned, so that
+    repeated values are only stored once.
+
+    Attributes:
+    - headers (Tuple[str]): first row of the table.
+    - columns (List[Tuple[str]]): values of each column, headers excluded.
+
+    Methods:
+    - from_rows: build a store from rows, headers first.
+    - iter_rows: iterate over the rows, headers excluded, as tuples.
+    - to_rows: return the rows, headers first, as lists.
+    - compress: return a store with the rows whose selector is true.
+    """
+    __slots__ = ('headers', 'columns')
+
+    def __init__(self, headers:Sequence[str], columns:Iterable[Sequence[Any]]):
+        self.headers = tuple(headers)
+        self.columns = [tuple(column) for column in columns]
+
+    @classmethod
+    def from_rows(cls, rows:Iterable[Sequence[Any]], intern_columns:Iterable[int] = ()) -> 'RowStore':
+        """
+        Args:
+            - rows (Iterable[Sequence]): rows of the table, headers first. Rows shorter than the
+            headers (e.g. tables of several pages put together) are padded with empty strings.
+            - intern_columns (Iterable[int]): positions of the columns whose values are interned.
+
+        Returns:
+            - RowStore
+
+        Raises:
+            - ValueError: if a row has more values than the headers.
+        """
+        rows = iter(rows)
+        headers = next(rows, None)
+        if headers is None:
+            return cls((), [])
+
+        width = len(headers)
+
+        def fit(position:int, row:Sequence[Any]) -> Sequence[Any]:
+            if len(row) > width:
+                raise ValueError(f"Row {position} has {len(row)} values, but there are {width} headers: {list(headers)}.")
+            return tuple(row) + ('',) * (width - len(row))
+
+        rows = list(rows)
+        if set(map(len, rows)) - {width}:
+            rows = [row if len(row) == width else fit(position, row) for position, row in enumerate(rows, start=1)]
+        columns = list(zip(*rows)) or [()] * width
+
+        for i in {index % width for index in intern_columns} if width else ():
+            columns[i] = tuple(sys.intern(value) if type(value) is str else value for value in columns[i])
+
+        return cls(headers, columns)
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*self.columns)
+
+    def to_rows(self) -> List[List[Any]]:
+        return [list(self.headers)] + [list(row) for row in self.iter_rows()]
+
+    def compress(self, selectors:Iterable[bool]) -> 'RowStore':
+        selectors = list(selectors)
+        return RowStore(self.headers, [compress(column, selectors) for column in self.columns])
@@ -1,6 +1,10 @@
+from bankparse.table_manager.normalization import normalize_date
+import warnings
+
 def ddmmyyyy_date_to_yyyymmdd(date):
     """
     Utils function to convert date from dd/mm/yyyy to yyyy-mm-dd.
+    Deprecated: use bankparse.table_manager.normalization.normalize_date.
 
     Args:
         - date (str): date under dd/mm/yyyy format.
@@ -8,5 +12,27 @@ def ddmmyyyy_date_to_yyyymmdd(date):
     Return:
         date under yyyy-mm-dd format.
     """
-    dd, mm, yyyy = date.split('/')
-    return '-'.join((yyyy, mm, dd))
\ No newline at end of file
+    warnings.warn(
+        "ddmmyyyy_date_to_yyyymmdd is deprecated, use bankparse.table_manager.normalization.normalize_date",
+        DeprecationWarning, stacklevel=2
+    )
+    return normalize_date(date)
+
+def ddmm_date_to_yyyymmdd(date, extraction_date):
+    """
+    Utils function to convert date from dd.mm to yyyy-mm-dd.
+    The year is taken from the extraction date of the file, or the year before for december.
+    Deprecated: use bankparse.table_manager.normalization.normalize_date.
+
+    Args:
+        - date (str): date under dd.mm format.
+        - extraction_date (str): extraction date of the file, under yyyy-mm-dd format.
+
+    Return:
+        date under yyyy-mm-dd format.
+    """
+    warnings.warn(
+        "ddmm_date_to_yyyymmdd is deprecated, use bankparse.table_manager.normalization.normalize_date",
+        DeprecationWarning, stacklevel=2
+    )
+    return normalize_date(date, extraction_date)
@@ -4,6 +4,26 @@ from unidecode import unidecode
 def matches(pattern: str, text: str) -> bool:
     return bool(re.search(pattern, text))
 
+def find_subclass(base:type, name:str) -> type:
+    """
+    Find a subclass of base from its name, looking through the whole hierarchy.
+
+    Args:
+        base: root class of the hierarchy
+        name: name of the subclass
+
+    Returns:
+        the subclass
+    """
+    stack = [base]
+    while stack:
+        cls = stack.pop()
+        if cls.__name__ == name:
+            return cls
+        stack += cls.__subclasses__()
+
+    raise KeyError(f"Unknown subclass of {base.__name__}: {name}")
+
 def month_from_name(month:str) -> str:
     """
     Transform french months to their associated number.
@@ -0,0 +1,14 @@
+import pytest
+import synthetic
+
+@pytest.fixture(scope='session')
+def statements(tmp_path_factory) -> dict[str, str]:
+    """
+    Synthetic statement file of each bank, see benchmarks/synthetic.py.
+    """
+    directory = tmp_path_factory.mktemp('statements')
+    paths = {}
+    for bank, writer in (('ca', synthetic.ca_statement), ('cm', synthetic.cm_statement), ('bourso', synthetic.bourso_statement)):
+        paths[bank] = str(directory / f"{bank}.pdf")
+        writer(paths[bank], pages=2, rows=20)
+    return paths
@@ -0,0 +1,18 @@
+import pytest
+from bankparse.file_manager import FileFactory
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+from bankparse.arrow import PARTITION_COLUMNS, dataset_schema, write_transactions_dataset
+
+def test_files_without_extraction_date_go_to_the_null_partition(statements, tmp_path):
+    extraction_file = FileFactory.handle_file(statements['cm'])
+    extraction_file.extraction_date = None
+
+    n_rows = write_transactions_dataset([extraction_file], str(tmp_path))
+
+    schema = dataset_schema()
+    partitioning = ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor='hive')
+    table = ds.dataset(str(tmp_path), partitioning=partitioning).to_table()
+    assert n_rows == table.num_rows > 0
+    assert table.column('month').null_count == n_rows
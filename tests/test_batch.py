@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+from bankparse import batch
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, function, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(function, *args, **kwargs)
+
+def test_submissions_are_bounded(monkeypatch):
+    monkeypatch.setattr(batch, 'parse_file', lambda path, **kwargs: {'file_path':path})
+    paths = [f'{i}.pdf' for i in range(50)]
+
+    with CountingExecutor() as executor:
+        records = []
+        for record in batch._iter_windowed(executor, paths, chunksize=2, window=4):
+            records.append(record)
+            # The chunks read so far, and at most 4 more.
+            assert executor.submitted <= (len(records) + 1) // 2 + 4
+
+    assert [record['file_path'] for record in records] == paths
+    assert executor.submitted == 25
@@ -0,0 +1,10 @@
+from bankparse.cache import ParseCache
+
+def test_replaced_entries_are_counted_once(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    cache.put('a' * 64, {'rows':[]})
+    for n in range(10):
+        cache.put('a' * 64, {'rows':list(range(n))})
+        cache.put('b' * 64, {'rows':list(range(n))})
+
+    assert cache._size == sum(entry[1] for entry in cache._entries())
@@ -0,0 +1,31 @@
+import hashlib
+import pytest
+from bankparse.cache import ParseCache
+from bankparse.catalog import scan_file
+from bankparse.file_manager import FileFactory
+from bankparse.instrumentation import collect
+
+@pytest.mark.parametrize('bank', ['ca', 'cm', 'bourso'])
+def test_cached_scan_doesnt_extract_tables(statements, bank, tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+
+    with collect() as stats:
+        record = scan_file(statements[bank], cache=cache)
+
+    assert 'extract_tables' not in stats.to_dict()
+    assert record['status'] == 'ok' and record['accounts']
+    assert list(cache._entries()) == []
+
+    with open(statements[bank], 'rb') as f:
+        assert record['content_hash'] == hashlib.sha256(f.read()).hexdigest()
+
+def test_scan_reads_the_header_from_a_cache_hit(statements, tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    expected = scan_file(statements['cm'])
+    FileFactory.handle_file(statements['cm'], cache=cache)
+
+    with collect() as stats:
+        record = scan_file(statements['cm'], cache=cache)
+
+    assert 'pdf_open' not in stats.to_dict()
+    assert record == expected
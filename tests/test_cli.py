@@ -0,0 +1,19 @@
+import pytest
+from bankparse.cli import _ParquetWriter
+from bankparse.file_manager import FileFactory, AccountExtractionFile
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+def test_parquet_statements_are_written_per_bank(statements, tmp_path):
+    cm = FileFactory.handle_file(statements['cm'])
+    other = AccountExtractionFile.deserialize(cm.serialize())
+    other.sourceBankLabel = 'Other Bank'
+    for table in other.statement_tables:
+        table.content = [['Compte', 'Solde'], *[(row[0], row[-1]) for row in table.content[1:]]]
+
+    writer = _ParquetWriter(str(tmp_path / 'statements.parquet'))
+    assert writer.write(cm, 'statements') == writer.write(other, 'statements') > 0
+    writer.close()
+
+    assert pq.read_table(tmp_path / 'statements.credit_mutuel.parquet').column_names[-3:] == ['Compte', 'Libellé', 'Solde']
+    assert pq.read_table(tmp_path / 'statements.other_bank.parquet').column_names[-2:] == ['Compte', 'Solde']
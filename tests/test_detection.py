@@ -0,0 +1,21 @@
+from bankparse.file_manager import FileFactory, CMAccountExtractionFile
+from bankparse.instrumentation import collect
+from synthetic import Page, write_pdf
+
+def test_content_hit_is_checked_against_the_band(tmp_path):
+    # The footer isn't found in the content stream, as with an encoded font, while
+    # another bank is mentioned in the body, e.g. in the label of a transfer.
+    path = str(tmp_path / 'cm.pdf')
+    page = Page(595, 842)
+    page.text(40, 400, "Boursorama")
+    page.text(40, 805, "CREDIT MUTUEL DE TEST")
+    write_pdf(path, [page])
+
+    assert FileFactory.detect(path) is CMAccountExtractionFile
+
+def test_bands_are_laid_out_alone(statements):
+    for bank, path in statements.items():
+        with collect() as stats:
+            FileFactory.detect(path)
+        # Only the band of the detected bank, without the whole first page.
+        assert stats.to_dict()['extract_words']['calls'] == 1, bank
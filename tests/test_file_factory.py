@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, math, threading, time
+import pytest
+from bankparse.cache import ParseCache
+from bankparse.file_manager import FileFactory, AccountExtractionFile
+from bankparse.instrumentation import collect
+from bankparse.pdf_document import ExtractionProfile
+
+PROFILE = ExtractionProfile(bbox=(0, 0, math.inf, 810))
+
+@pytest.mark.parametrize('bank', ['ca', 'cm', 'bourso'])
+def test_profile_is_threaded_through_the_factory(statements, bank):
+    default = FileFactory.handle_file(statements[bank])
+    profiled = FileFactory.handle_file(statements[bank], page_jobs=1, profile=PROFILE)
+
+    assert default.profile == ExtractionProfile()
+    assert profiled.profile == PROFILE
+    assert profiled.serialize()['transaction_tables'] == default.serialize()['transaction_tables']
+
+    deserialized = AccountExtractionFile.deserialize(profiled.serialize())
+    assert deserialized.profile == PROFILE
+
+def test_cache_keeps_an_entry_per_profile(statements, tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    FileFactory.handle_file(statements['cm'], cache=cache)
+    FileFactory.handle_file(statements['cm'], cache=cache, profile=PROFILE)
+    assert len(list(cache._entries())) == 2
+
+    with collect() as stats:
+        default = FileFactory.handle_file(statements['cm'], cache=cache)
+        profiled = FileFactory.handle_file(statements['cm'], cache=cache, profile=PROFILE)
+
+    assert 'pdf_open' not in stats.to_dict()
+    assert (default.profile, profiled.profile) == (ExtractionProfile(), PROFILE)
+    assert cache.key(statements['cm']) == cache.key(statements['cm'], profile=ExtractionProfile())
+
+@pytest.mark.parametrize('bank', ['ca', 'cm', 'bourso'])
+def test_loaded_file_is_opened_once(statements, bank, tmp_path):
+    with collect() as stats:
+        FileFactory.handle_file(statements[bank], load=True).serialize()
+        FileFactory.handle_file(statements[bank], cache=ParseCache(str(tmp_path / 'cache'))).serialize()
+
+    assert stats.to_dict()['pdf_open']['calls'] == 2
+
+def test_async_parsing_is_bounded_by_default(monkeypatch):
+    import bankparse.file_manager as file_manager
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def parse(file_path, cache=None, profile=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    monkeypatch.setattr(file_manager, '_handle_file_serialized', parse)
+    monkeypatch.setattr(file_manager.os, 'cpu_count', lambda: 2)
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            await asyncio.gather(*(FileFactory.handle_file_async(f'{i}.pdf', executor=executor) for i in range(8)))
+
+    asyncio.run(main())
+    assert peak == 2
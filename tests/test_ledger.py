@@ -0,0 +1,23 @@
+import pytest
+from bankparse.file_manager import FileFactory, AccountExtractionFile
+from bankparse.ledger import Ledger
+
+@pytest.mark.parametrize('bank', ['ca', 'cm', 'bourso'])
+def test_append_deserialized_file_without_pdf(statements, bank, tmp_path):
+    parsed = FileFactory.handle_file(statements[bank])
+    expected = [transaction for table in parsed.transaction_tables for transaction in table.iter_transactions()]
+
+    data = dict(parsed.serialize(), file_path=str(tmp_path / 'moved.pdf'))
+    deserialized = AccountExtractionFile.deserialize(data)
+
+    ledger = Ledger()
+    assert ledger.append(deserialized) == len(expected) > 0
+    assert ledger.append(deserialized) == 0
+    assert sorted(ledger.get_transactions(), key=Ledger.transaction_key) == sorted(expected, key=Ledger.transaction_key)
+
+def test_append_streams_files_without_tables(statements):
+    parsed = FileFactory.handle_file(statements['cm'])
+    streamed = Ledger([parsed])
+
+    assert 'transaction' not in parsed._tables
+    assert streamed.get_transactions() == Ledger(parsed.transaction_tables).get_transactions()
@@ -0,0 +1,13 @@
+import pytest
+from bankparse.table_manager import utils
+from bankparse.table_manager.normalization import normalize_date, normalize_dates
+
+def test_deprecated_date_helpers_wrap_normalize_date():
+    with pytest.deprecated_call():
+        assert utils.ddmmyyyy_date_to_yyyymmdd('05/03/2024') == normalize_date('05/03/2024') == '2024-03-05'
+    with pytest.deprecated_call():
+        assert utils.ddmm_date_to_yyyymmdd('05.12', '2024-01-10') == normalize_date('05.12', '2024-01-10') == '2023-12-05'
+
+def test_normalize_dates_matches_normalize_date():
+    dates = ['05/03/2024', '05.12', '31.01', '', 'SOLDE']
+    assert normalize_dates(dates, '2024-01-10').tolist() == [normalize_date(d, '2024-01-10') for d in dates]
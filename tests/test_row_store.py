@@ -0,0 +1,45 @@
+import pytest
+from bankparse.table_manager.row_store import RowStore
+from bankparse.table_manager.ca_transaction_table import CABankTransactionTable
+
+HEADERS = ['Date opé.', 'Date valeur', 'Libellé', 'Débit', 'Crédit']
+
+def test_short_rows_are_padded():
+    store = RowStore.from_rows([HEADERS, ['01.02', '01.02', 'PRLV', '12,00', ''], ['02.02', '02.02', 'VIR']])
+
+    assert store.to_rows()[1:] == [['01.02', '01.02', 'PRLV', '12,00', ''], ['02.02', '02.02', 'VIR', '', '']]
+
+def test_long_rows_are_rejected_with_the_table():
+    with pytest.raises(ValueError, match=r'CABankTransactionTable of account 123.*Row 2 has 6 values'):
+        CABankTransactionTable(
+            [HEADERS, ['01.02', '01.02', 'PRLV', '12,00', ''], ['02.02', '02.02', 'VIR', '', '5,00', '?']],
+            'Jean Dupont', '2024-03-01', '123'
+        )
+
+def test_ragged_table():
+    # Tables of several pages are put together, the last one with fewer columns.
+    table = CABankTransactionTable(
+        [
+            HEADERS,
+            ['01.02', '01.02', 'PRLV ABONNEMENT', '12,00', ''],
+            ['03.02', '03.02', 'VIR SALAIRE', '', '1 500,00'],
+            ['05.02', '05.02', 'CARTE', '8,50'],
+        ],
+        'Jean Dupont', '2024-03-01', '123'
+    )
+
+    assert len(table.rows) == 3
+    assert table.get_dict()['Crédit'] == ['', '1500.00', '']
+    assert table.get_dataframe(typed=True)['amount'].tolist() == [-12.0, 1500.0, -8.5]
+
+def test_content_is_read_only():
+    table = CABankTransactionTable([HEADERS, ['01.02', '01.02', 'PRLV', '12,00', '']], 'Jean Dupont', '2024-03-01', '123')
+
+    with pytest.raises(TypeError):
+        table.content[1][2] = 'VIR'
+    with pytest.raises(AttributeError):
+        table.content.append(['02.02', '02.02', 'VIR', '', '5,00'])
+
+    table.content = [*table.content, ['02.02', '02.02', 'VIR', '', '5,00']]
+    assert table.content[-1] == ('02.02', '02.02', 'VIR', '', '5,00')
+    assert table.serialize()['content'][-1] == ['02.02', '02.02', 'VIR', '', '5,00']